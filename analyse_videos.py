@@ -0,0 +1,158 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import numpy as np
+import cv2
+
+
+"""
+Video analysis: runs the colour tracking of the game over recorded videos of the cards, to tune min_area, max_area and the colour ranges without playing.
+Every frame of every video goes through the same steps as in the game (resize to the width of the game, HSV colour ranges, contours within min_area and max_area, see color_tracker.py),
+and the number, total area and centroid of the detected contours of every colour are saved for every frame.
+
+The videos are cut into chunks of frames, and the chunks are analysed by a pool of processes, so long videos use all cores of the PC too.
+The results are saved in one .npz file with one array per column (one row per frame), which loads quickly and is easy to query, for example:
+    detections = np.load("detections.npz")
+    detections["count"][:, 0]                                      number of contours of the first colour in every frame
+    detections["frame"][(detections["video"] == 0) & (detections["count"][:, 1] == 0)]    frames of the first video where the second colour was not found
+
+python analyse_videos.py recordings/ -r color_ranges.json --min_area 30 --max_area 300 -o detections.npz
+"""
+
+VIDEO_SUFFIXES = {".mp4", ".avi", ".mov", ".mkv", ".m4v", ".wmv"}
+
+
+def find_videos(paths):
+    videos = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            videos += sorted(video for video in path.iterdir() if video.suffix.lower() in VIDEO_SUFFIXES)
+        else:
+            videos.append(path)
+    return videos
+
+
+def load_color_ranges(path):
+    with open(path, "r") as jsonfile:
+        data = json.load(jsonfile)
+    return [colour["lower_range"] for colour in data], [colour["upper_range"] for colour in data]
+
+
+## cut a video into chunks of frames (start, stop); the last chunk reads to the end, as the frame count of a video file is not always exact
+def video_chunks(path, chunk_frames):
+    cap = cv2.VideoCapture(str(path))
+    num_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    starts = list(range(0, max(num_frames, 1), chunk_frames))
+    return fps, [(start, stop) for start, stop in zip(starts, starts[1:] + [None])]
+
+
+## runs in a worker process: track the colours in the frames start to stop of a video
+def analyse_chunk(path, start, stop, lower_ranges, upper_ranges, min_area, max_area, width):
+    from camera_config import fit_frame
+    from color_tracker import ColorTracker
+
+    tracker = ColorTracker(lower_ranges, upper_ranges, min_area, max_area)
+    cap = cv2.VideoCapture(str(path))
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    ## some video formats cannot jump to a frame: then read up to it
+    position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    if position != start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        for _ in range(start):
+            cap.grab()
+    counts, areas, centroids = [], [], []
+    while stop is None or start + len(counts) < stop:
+        grabbed, frame = cap.read()
+        if not grabbed:
+            break
+        if width:
+            frame = fit_frame(frame, width)
+        results = tracker.track(frame)
+        counts.append([count for count, _ in results])
+        areas.append([area for _, area in results])
+        centroids.append(tracker.centroids)
+    cap.release()
+    num_colours = len(lower_ranges)
+    return (
+        np.arange(start, start + len(counts), dtype=np.int32),
+        np.array(counts, dtype=np.int32).reshape(-1, num_colours),
+        np.array(areas, dtype=np.float32).reshape(-1, num_colours),
+        np.array(centroids, dtype=np.float32).reshape(-1, num_colours, 2),
+    )
+
+
+## an area limit for argparse: a negative min_area would accept contours of area 0, which have no centroid
+def area_limit(value):
+    area = float(value)
+    if area < 0:
+        raise argparse.ArgumentTypeError(f"an area cannot be negative: {value}")
+    return area
+
+
+def analyse(args):
+    videos = find_videos(args.videos)
+    if not videos:
+        print(f"[INFO] No videos ({', '.join(sorted(VIDEO_SUFFIXES))}) found in {', '.join(args.videos)}, nothing to analyse")
+        return
+    lower_ranges, upper_ranges = load_color_ranges(args.color_ranges)
+    jobs = []
+    frame_rates = []
+    for index, video in enumerate(videos):
+        fps, chunks = video_chunks(video, args.chunk_frames)
+        frame_rates.append(fps)
+        jobs += [(index, video, start, stop) for start, stop in chunks]
+    print(f"[INFO] {len(videos)} videos in {len(jobs)} chunks of up to {args.chunk_frames} frames")
+    ## (video, first frame) -> columns of the chunk
+    chunks = {}
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(analyse_chunk, video, start, stop, lower_ranges, upper_ranges, args.min_area, args.max_area, args.width): (index, start)
+            for index, video, start, stop in jobs
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            chunks[futures[future]] = future.result()
+            print(f"[INFO] {done}/{len(jobs)} chunks analysed", end="\r")
+    print()
+    elapsed = time.perf_counter() - start_time
+    ## put the chunks back in the order of the videos and the frames
+    keys = sorted(chunks)
+    frame = np.concatenate([chunks[key][0] for key in keys])
+    video = np.concatenate([np.full(len(chunks[key][0]), key[0], dtype=np.int32) for key in keys])
+    fps = np.array(frame_rates, dtype=np.float64)
+    np.savez(
+        args.output,
+        video=video,
+        frame=frame,
+        time=frame / np.where(fps[video] > 0, fps[video], 1),
+        count=np.concatenate([chunks[key][1] for key in keys]),
+        area=np.concatenate([chunks[key][2] for key in keys]),
+        centroid=np.concatenate([chunks[key][3] for key in keys]),
+        video_names=np.array([str(video) for video in videos]),
+        lower_ranges=np.array(lower_ranges),
+        upper_ranges=np.array(upper_ranges),
+        area_limits=np.array([args.min_area, args.max_area]),
+    )
+    print(
+        f"[INFO] Analysed {len(frame)} frames in {elapsed:.1f} s ({len(frame) / elapsed:.0f} frames/s on {args.workers or os.cpu_count()} processes), "
+        f"saved to {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("videos", nargs="+", help="Video files, or folders with video files")
+    ap.add_argument("-r", "--color_ranges", default="color_ranges.json", help="Colour profile with the HSV ranges of the cards (saved by color_identification.py)")
+    ap.add_argument("--min_area", type=area_limit, default=10, help="Smallest area of a contour that counts as a detection")
+    ap.add_argument("--max_area", type=area_limit, default=300, help="Largest area of a contour that counts as a detection")
+    ap.add_argument("--width", type=int, default=480, help="Width the frames are resized to before tracking, 480 like in the game. 0 keeps the size of the video")
+    ap.add_argument("-c", "--chunk_frames", type=int, default=500, help="How many frames of a video one process analyses at a time")
+    ap.add_argument("-w", "--workers", type=int, help="How many processes to use. If it's  not provided, all cores are used")
+    ap.add_argument("-o", "--output", default="detections.npz", help="File to save the detections of every frame to")
+    args = ap.parse_args()
+    analyse(args)
@@ -0,0 +1,77 @@
+import itertools
+import numpy as np
+import pygame
+
+
+"""
+Ball renderer: draws many balls with one call, instead of one pygame.draw.circle per ball (Ball.display).
+Every ball of a given size and colour looks the same, so the circle is drawn only once into a small image (a sprite),
+and that sprite is copied to the positions of all balls by a single Surface.blits call, which loops over the positions in C instead of Python.
+The pixels are exactly the ones pygame.draw.circle would draw.
+
+Practice: with 2 balls this makes no difference, but run this code to compare both ways of drawing with thousands of balls.
+"""
+
+
+class BallRenderer:
+    def __init__(self):
+        self.sprites = {}
+
+    ## the circle drawn once into an image of its bounding box; the pixels around the circle are transparent (colour key)
+    def sprite(self, radius, colour):
+        colour = pygame.Color(colour)
+        key = (radius, tuple(colour))
+        if key not in self.sprites:
+            sprite = pygame.Surface((2 * radius, 2 * radius))
+            transparent = (0, 0, 0) if tuple(colour)[:3] != (0, 0, 0) else (255, 255, 255)
+            sprite.fill(transparent)
+            pygame.draw.circle(sprite, colour, (radius, radius), radius)
+            sprite.set_colorkey(transparent, pygame.RLEACCEL)
+            self.sprites[key] = sprite
+        return self.sprites[key]
+
+    ## draw balls of the same radius and colour at every centre (x, y) of positions, an array of shape (n, 2)
+    def draw(self, surface, positions, radius, colour):
+        sprite = self.sprite(radius, colour)
+        corners = (np.asarray(positions) - radius).tolist()
+        surface.blits(zip(itertools.repeat(sprite), corners), doreturn=False)
+
+    ## draw Ball objects; the balls of the same size and colour are drawn with one call
+    def draw_balls(self, surface, balls):
+        groups = {}
+        for ball in balls:
+            groups.setdefault((ball.radius, tuple(ball.color)), []).append((ball.posx, ball.posy))
+        for (radius, colour), positions in groups.items():
+            self.draw(surface, positions, radius, colour)
+
+
+if __name__ == "__main__":
+    import time
+
+    WIDTH, HEIGHT = 900, 600
+    FRAME_BUDGET = 1 / 120
+    rng = np.random.default_rng(0)
+    renderer = BallRenderer()
+    circle_screen = pygame.Surface((WIDTH, HEIGHT))
+    sprite_screen = pygame.Surface((WIDTH, HEIGHT))
+    for num_balls in (1000, 5000, 20000):
+        ## balls of two colours, some of them partly outside the field
+        positions = rng.integers(-10, (WIDTH + 10, HEIGHT + 10), size=(num_balls, 2))
+        colours = [pygame.Color(255, 255, 255), pygame.Color(255, 0, 0)]
+        times = {}
+        for name, screen in (("pygame.draw.circle", circle_screen), ("BallRenderer", sprite_screen)):
+            start = time.perf_counter()
+            for _ in range(10):
+                screen.fill((0, 0, 0))
+                for k, colour in enumerate(colours):
+                    if screen is circle_screen:
+                        for x, y in positions[k::2].tolist():
+                            pygame.draw.circle(screen, colour, (x, y), 7)
+                    else:
+                        renderer.draw(screen, positions[k::2], 7, colour)
+            times[name] = (time.perf_counter() - start) / 10
+        same = pygame.image.tobytes(circle_screen, "RGB") == pygame.image.tobytes(sprite_screen, "RGB")
+        print(
+            f"[INFO] {num_balls} balls: " + ", ".join(f"{name} {elapsed * 1000:.2f} ms" for name, elapsed in times.items())
+            + f" (the budget of a frame at 120 fps is {FRAME_BUDGET * 1000:.1f} ms), same pixels: {same}"
+        )
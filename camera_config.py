@@ -0,0 +1,88 @@
+import time
+import cv2
+import imutils
+from imutils.video import WebcamVideoStream
+
+
+"""
+Camera configuration: ask the camera for the frames we actually want, instead of resizing every frame afterwards.
+A webcam delivers frames at its default resolution and format unless it is told otherwise. If the game only needs 480 pixels wide frames,
+every bigger frame has to be resized in the game loop, which costs time at every frame.
+Here, the resolution, frame rate, pixel format (for example MJPG, which allows higher frame rates over USB) and buffer size are requested from the camera.
+Not every camera supports every setting, so the settings that were actually granted are read back and reported.
+When the camera already delivers frames of the right size, the resize is skipped.
+
+The stream also numbers the frames it captures and notes when each was captured (read_latest), as the game usually asks for frames faster than the camera delivers them
+(120 game frames per second against 30 camera frames per second: the same frame 4 times in a row). The game uses the number to process every camera frame only once.
+"""
+
+
+## open a camera and request the given settings; settings that are None are left to the driver
+## the pixel format is set first, because it decides which resolutions and frame rates the camera offers
+def open_camera(src=0, width=None, height=None, fps=None, fourcc=None, buffer_size=None):
+    cap = cv2.VideoCapture(src)
+    if fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    if width:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    if height:
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    if fps:
+        cap.set(cv2.CAP_PROP_FPS, fps)
+    if buffer_size:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+    return cap
+
+
+## read back what the camera granted
+def camera_report(cap):
+    fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+    return {
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": cap.get(cv2.CAP_PROP_FPS),
+        "fourcc": "".join(chr((fourcc >> (8 * k)) & 0xFF) for k in range(4)) if fourcc > 0 else "default",
+        "buffer_size": int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+    }
+
+
+def print_camera_report(report, requested_width=None, requested_height=None):
+    print(
+        f"[INFO] The camera captures {report['width']}x{report['height']} at {report['fps']:.0f} fps in {report['fourcc']} format with a buffer of {report['buffer_size']} frame(s)"
+    )
+    if requested_width and (report["width"] != requested_width or (requested_height and report["height"] != requested_height)):
+        print(f"[INFO] The requested size {requested_width}x{requested_height} is not available, frames are resized in the game loop")
+
+
+## resize a frame to the given width (and height), or return it as it is when it already has that size
+## when only the width is given, the aspect ratio is kept like imutils.resize does
+def fit_frame(frame, width, height=None):
+    frame_height, frame_width = frame.shape[:2]
+    if frame_width == width and (height is None or frame_height == height):
+        return frame
+    if height is None:
+        return imutils.resize(frame, width=width)
+    return cv2.resize(frame, (width, height))
+
+
+## the threaded video stream of imutils, reading from a camera configured with open_camera
+## every captured frame gets a sequence number (1 for the first frame) and a capture timestamp (time.perf_counter)
+class ConfiguredVideoStream(WebcamVideoStream):
+    def __init__(self, src=0, name="ConfiguredVideoStream", **camera_settings):
+        self.stream = open_camera(src, **camera_settings)
+        self.report = camera_report(self.stream)
+        (self.grabbed, self.frame) = self.stream.read()
+        self.latest = (1, time.perf_counter(), self.frame)
+        self.name = name
+        self.stopped = False
+
+    def update(self):
+        while not self.stopped:
+            (grabbed, frame) = self.stream.read()
+            ## one assignment, so that read_latest always returns a frame together with its own number and timestamp
+            self.latest = (self.latest[0] + 1, time.perf_counter(), frame)
+            (self.grabbed, self.frame) = (grabbed, frame)
+
+    ## the most recent frame as (sequence number, capture timestamp, frame); the same sequence number means the same frame as before
+    def read_latest(self):
+        return self.latest
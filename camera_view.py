@@ -0,0 +1,76 @@
+import numpy as np
+import cv2
+import pygame
+
+
+"""
+Camera view: a small panel in the game window that shows what the camera sees and what the colour tracking detects.
+The panel shows a downscaled camera frame and, next to it, the mask of every colour (white where the colour is detected) with the number and area of the detected contours.
+
+The images of the panel are NumPy arrays that pygame shows directly: pygame.image.frombuffer wraps the array as a surface without copying it.
+When the arrays are updated in place, the surfaces show the new pixels, so the panel costs only one small resize per new camera frame and a few blits per game frame.
+"""
+
+PANEL_WIDTH = 160
+MARGIN = 5
+
+
+class CameraView:
+    ## input: shape of the camera frame, number of masks, one colour (or one palette of 256 colours) per mask, position of the top-left corner in the window
+    def __init__(self, frame_shape, mask_colours, position=(MARGIN, None), field_height=600):
+        frame_height, frame_width = frame_shape[:2]
+        self.size = (PANEL_WIDTH, PANEL_WIDTH * frame_height // frame_width)
+        width, height = self.size
+        self.position = (position[0], field_height - height - MARGIN - 18 if position[1] is None else position[1])
+        self.font = pygame.font.Font("freesansbold.ttf", 12)
+        ## the arrays the camera frame and the masks are resized into, and the surfaces that show them without a copy
+        self.small_frame = np.zeros((height, width, 3), dtype=np.uint8)
+        self.frame_surface = pygame.image.frombuffer(self.small_frame, self.size, "BGR")
+        self.small_masks = []
+        self.mask_surfaces = []
+        for colour in mask_colours:
+            small_mask = np.zeros((height, width), dtype=np.uint8)
+            surface = pygame.image.frombuffer(small_mask, self.size, "P")
+            if len(colour) == 256:
+                surface.set_palette(colour)
+            else:
+                ## shades from black (0) to the colour of the mask (255)
+                surface.set_palette([tuple(channel * level // 255 for channel in colour) for level in range(256)])
+            self.small_masks.append(small_mask)
+            self.mask_surfaces.append(surface)
+        self.labels = [None] * len(mask_colours)
+
+    ## call this only when a new camera frame was tracked; the surfaces follow the arrays by themselves
+    ## input: camera frame (BGR), masks of the same size, one text per mask (for example the number and area of the contours)
+    def update(self, frame, masks, texts=()):
+        cv2.resize(frame, self.size, dst=self.small_frame, interpolation=cv2.INTER_AREA)
+        for mask, small_mask in zip(masks, self.small_masks):
+            cv2.resize(mask, self.size, dst=small_mask, interpolation=cv2.INTER_NEAREST)
+        for k, text in enumerate(texts):
+            self.labels[k] = self.font.render(text, True, (255, 255, 255))
+
+    def draw(self, screen):
+        x, y = self.position
+        step = self.size[0] + MARGIN
+        screen.blit(self.frame_surface, (x, y))
+        for k, surface in enumerate(self.mask_surfaces):
+            screen.blit(surface, (x + (k + 1) * step, y))
+            if self.labels[k] is not None:
+                screen.blit(self.labels[k], (x + (k + 1) * step, y + self.size[1] + 3))
+
+
+## the colour in the middle of an HSV range as RGB, to paint the mask of that colour
+def range_colour(lower_range, upper_range):
+    middle = (np.asarray(lower_range, dtype=np.int32) + np.asarray(upper_range, dtype=np.int32)) // 2
+    ## full saturation and brightness, so that dark or pale colours remain visible on the mask
+    hsv = np.array([[[middle[0], 255, 255]]], dtype=np.uint8)
+    return tuple(int(channel) for channel in cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)[0, 0])
+
+
+## a palette for label images: black background and a different hue for every player
+def label_palette(num_players):
+    palette = [(0, 0, 0)] * 256
+    for label in range(1, num_players + 1):
+        hue = int(180 * (label - 1) / max(num_players, 1))
+        palette[label] = range_colour((hue, 0, 0), (hue, 0, 0))
+    return palette
@@ -0,0 +1,146 @@
+import numpy as np
+import cv2
+import json
+import time
+
+
+"""
+Collective tracking: many players, one camera.
+In the collective mode, every striker of the "Collective Power" team follows its own colour card (or a group of colour cards).
+Instead of running color_track once per colour, every pixel of the frame is labelled in a single pass with small lookup tables (LUT) that map each H, S and V value to the colour profiles accepting it.
+The size and the centroid of every player's colour are then counted for all players at once, so the vision cost stays nearly the same whether 2 or 16 players join the game.
+
+The players are described in 'collective_config.json' as a list of dicts, one dict per striker:
+"profiles": indices of the colour profiles in 'color_ranges.json' that drive this striker
+"lane": the top and bottom of the part of the field this striker can move in
+"posx" (optional): horizontal position of the striker, the right border by default
+
+Practice: run this code to compare how long it takes to label a frame for 2, 4, 8 and 16 players.
+"""
+
+# a player only moves its striker when at least this many pixels of its colour are seen
+MIN_PIXELS = 30
+
+
+## label the colours of many players in one pass over the frame
+## every colour profile used by a player gets one bit: the H, S and V tables tell, for each channel value, which profiles accept it
+## a pixel belongs to a profile when the bit is set in all three channels, and the lowest set bit decides which player owns the pixel
+## input: colour profiles from color_ranges.json and, for each player, the indices of the profiles it follows
+class CollectiveTracker:
+    def __init__(self, colour_profiles, player_profiles, blur_size=3):
+        bit_owner = []
+        for player, profile_ids in enumerate(player_profiles):
+            for profile_id in profile_ids:
+                bit_owner.append((player, colour_profiles[profile_id]))
+        if len(bit_owner) > 32:
+            raise ValueError("At most 32 colour profiles can be tracked at the same time")
+        self.num_players = len(player_profiles)
+        self.blur_size = blur_size
+        channel_luts = np.zeros((3, 256), dtype=np.uint32)
+        ## label 0 is the background, player k gets the label k + 1
+        owner_of_bit = np.zeros(33, dtype=np.uint8)
+        for bit, (player, profile) in enumerate(bit_owner):
+            lower = profile.get("lower_range")
+            upper = profile.get("upper_range")
+            for channel in range(3):
+                channel_luts[channel, lower[channel] : upper[channel] + 1] |= np.uint32(1 << bit)
+            owner_of_bit[bit] = player + 1
+        ## cv2.LUT has no unsigned 32-bit type, the same bits are used as signed integers
+        self.channel_luts = channel_luts.view(np.int32)
+        ## label tables for the low and the high 16 bits: map a bitmask to the owner of its lowest set bit
+        values = np.arange(1 << 16)
+        lowest_bit = np.log2(values & -values, where=values > 0, out=np.full(values.shape, 32.0)).astype(np.intp)
+        self.label_low = owner_of_bit[lowest_bit]
+        self.label_high = owner_of_bit[np.where(lowest_bit < 32, lowest_bit + 16, 32)]
+        self._offsets_shape = None
+
+    def _offsets(self, shape):
+        ## index offsets that turn a label image into per-row and per-column histograms, cached for the frame size
+        if self._offsets_shape != shape:
+            height, width = shape
+            num_labels = self.num_players + 1
+            self.row_offsets = (np.arange(height, dtype=np.intp) * num_labels)[:, None]
+            self.col_offsets = (np.arange(width, dtype=np.intp) * num_labels)[None, :]
+            self._offsets_shape = shape
+        return self.row_offsets, self.col_offsets
+
+    ## a pixel keeps its label only when the label holds the majority of the blur_size x blur_size pixels around it, otherwise it becomes background
+    ## this is what a median filter of the mask of that player alone would keep; a median of the label numbers themselves is not a majority vote
+    ## and would keep a speck of one player next to the card of another. Counting equal neighbours costs the same for any number of players
+    def _denoise(self, labels):
+        radius = self.blur_size // 2
+        padded = cv2.copyMakeBorder(labels, radius, radius, radius, radius, cv2.BORDER_REPLICATE)
+        height, width = labels.shape
+        same = np.zeros(labels.shape, dtype=np.uint8)
+        for dy in range(self.blur_size):
+            for dx in range(self.blur_size):
+                same += padded[dy : dy + height, dx : dx + width] == labels
+        return np.where(same > self.blur_size * self.blur_size // 2, labels, np.uint8(0))
+
+    ## label every pixel and return, for each player, the number of pixels in its colour(s) and the centroid (x, y) of those pixels
+    ## pixels of the same colour are counted together, so one player can hold more than one card
+    def track(self, img):
+        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+        h, s, v = cv2.split(hsv)
+        bits = cv2.LUT(h, self.channel_luts[0])
+        cv2.bitwise_and(bits, cv2.LUT(s, self.channel_luts[1]), dst=bits)
+        cv2.bitwise_and(bits, cv2.LUT(v, self.channel_luts[2]), dst=bits)
+        bits = bits.view(np.uint32)
+        labels = np.take(self.label_low, bits & 0xFFFF)
+        high = np.take(self.label_high, bits >> 16)
+        np.copyto(labels, high, where=labels == 0)
+        ## remove isolated noisy pixels in the label image, which would otherwise pull the centroids around
+        if self.blur_size > 1:
+            labels = self._denoise(labels)
+        ## the label image of the last frame, for example to show it in the camera view
+        self.labels = labels
+        height, width = labels.shape
+        num_labels = self.num_players + 1
+        row_offsets, col_offsets = self._offsets(labels.shape)
+        per_row = np.bincount((labels + row_offsets).ravel(), minlength=height * num_labels).reshape(height, num_labels)
+        per_col = np.bincount((labels + col_offsets).ravel(), minlength=width * num_labels).reshape(width, num_labels)
+        counts = per_row.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            centroids = np.stack(
+                (np.arange(width) @ per_col / counts, np.arange(height) @ per_row / counts), axis=1
+            )
+        ## drop the background label
+        return counts[1:], centroids[1:]
+
+
+## load the players of the collective mode
+def load_collective_config(path="collective_config.json"):
+    with open(path, "r") as jsonfile:
+        players = json.load(jsonfile)
+    for player in players:
+        if not player.get("profiles"):
+            raise ValueError(f"Every player in {path} needs at least one colour profile")
+    return players
+
+
+## move every striker towards the height of its colour in the frame, mapped onto the striker's own lane
+## input: strikers, pixel counts and centroids from CollectiveTracker.track, height of the camera frame, minimum number of pixels to react
+def collective_controller(strikers, counts, centroids, frame_height, min_pixels=MIN_PIXELS):
+    y_facs = []
+    for striker, count, centroid in zip(strikers, counts, centroids):
+        if count < min_pixels:
+            y_facs.append(0)
+            continue
+        lane_top, lane_bottom = striker.lane
+        target = lane_top + centroid[1] / frame_height * (lane_bottom - lane_top) - striker.height / 2
+        y_facs.append(max(-1, min(1, (target - striker.posy) / striker.speed)))
+    return y_facs
+
+
+if __name__ == "__main__":
+    frame = np.random.randint(0, 256, (360, 480, 3), dtype=np.uint8)
+    profiles = [
+        {"lower_range": [h, 80, 50], "upper_range": [h + 9, 255, 255]} for h in range(0, 160, 10)
+    ]
+    for num_players in (2, 4, 8, 16):
+        tracker = CollectiveTracker(profiles, [[k] for k in range(num_players)])
+        start = time.perf_counter()
+        for _ in range(100):
+            tracker.track(frame)
+        elapsed = (time.perf_counter() - start) / 100
+        print(f"{num_players} players: {elapsed * 1000:.2f} ms per frame")
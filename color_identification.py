@@ -1,7 +1,10 @@
 import numpy as np
 import cv2
 import json
+import time
+import argparse
 from pathlib import Path
+from camera_config import open_camera, camera_report, print_camera_report, fit_frame
 
 
 """
@@ -18,12 +21,18 @@ Press S to save the values of colour range.
 Repeat the same procedure for the second colour.
 Press Q to leave this procedure.
 
+Auto-calibration: instead of dragging the trackbars, run this code with -a (or the game with -a).
+Drag a box around a card in the first picture and press ENTER or SPACE. Keep the card inside the box and move it a little for a few seconds.
+The colours inside the box are compared with the colours of the background, and the range that keeps most of the card and the least of the background is saved.
+Repeat the same procedure for the second card. Press ESC or C without a box to leave this procedure.
+
 """
 
 
 def hsv_color_range():
     counter=0
-    cap = cv2.VideoCapture(0)
+    cap = open_camera(0, 640, 480)
+    print_camera_report(camera_report(cap), 640, 480)
     trackbar_title="Key S to save & Q to ESC"
 
     cv2.namedWindow(trackbar_title)
@@ -42,7 +51,7 @@ def hsv_color_range():
         ret, frame = cap.read()
         if not ret:
             break
-        frame = cv2.resize(frame, (640, 480))
+        frame = fit_frame(frame, 640, 480)
         hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
 
 
@@ -71,24 +80,7 @@ def hsv_color_range():
 
         key = cv2.waitKey(1)
         if key == ord("s"):
-            color_ranges = {
-                "lower_range": lower_range.tolist(),
-                "upper_range": upper_range.tolist()
-            }
-            colour_profile = Path('color_ranges.json')
-            if colour_profile.is_file():
-                with open('color_ranges.json', 'r') as jsonfile:
-                    data = json.load(jsonfile)
-                    if not isinstance(data, list):
-                        data = [data]
-            else:
-                data = []
-
-            data.append(color_ranges)
-            print(f"save colour profile {colour_profile} to json file")
-
-            with open('color_ranges.json', 'w') as jsonfile:
-                json.dump(data, jsonfile, indent=4)
+            save_color_range(lower_range, upper_range)
         if key == ord("q"):
             break
 
@@ -98,11 +90,170 @@ def hsv_color_range():
     return lower_range, upper_range
 
 
+## add one colour range to the colour profile, which is a list of dicts with lower_range and upper_range
+def save_color_range(lower_range, upper_range):
+    color_ranges = {
+        "lower_range": [int(value) for value in lower_range],
+        "upper_range": [int(value) for value in upper_range]
+    }
+    colour_profile = Path('color_ranges.json')
+    if colour_profile.is_file():
+        with open('color_ranges.json', 'r') as jsonfile:
+            data = json.load(jsonfile)
+            if not isinstance(data, list):
+                data = [data]
+    else:
+        data = []
+
+    data.append(color_ranges)
+    print(f"save colour profile {colour_profile} to json file")
+
+    with open('color_ranges.json', 'w') as jsonfile:
+        json.dump(data, jsonfile, indent=4)
+
+
+## find the interval of one channel that keeps the most of the card and the least of the background
+## input: histograms of the card and of the background, how much a background pixel counts against a card pixel
+## the best interval is the one with the largest sum of (card share - background share) over its bins.
+## With the cumulative sum C of that difference, this is the largest C[end] - C[start] with start < end, found in one vectorised pass
+def best_channel_range(card_hist, background_hist, background_weight=1.0):
+    card_share = card_hist / max(card_hist.sum(), 1)
+    background_share = background_hist / max(background_hist.sum(), 1)
+    cumulative = np.concatenate(([0.0], np.cumsum(card_share - background_weight * background_share)))
+    lowest_so_far = np.minimum.accumulate(cumulative)
+    end = int(np.argmax(cumulative - lowest_so_far))
+    start = int(np.argmin(cumulative[: end + 1]))
+    if end <= start:
+        return 0, len(card_hist) - 1
+    return start, end - 1
+
+
+## the hue is a circle: red lies at both ends of the hue channel (0-10 and 170-179), but a range of cv2.inRange cannot wrap around
+## a card counts as split across the wrap when at least WRAP_SHARE of its pixels lie within WRAP_HUES of each end
+WRAP_HUES = 10
+WRAP_SHARE = 0.1
+
+
+## derive the lower and upper bound of the HSV threshold from histograms of the card and the background
+## input: lists of 3 histograms (H with 180 bins, S and V with 256 bins) for the card and the background
+def derive_hsv_range(card_hists, background_hists, background_weight=1.0):
+    bounds = [
+        best_channel_range(card_hist, background_hist, background_weight)
+        for card_hist, background_hist in zip(card_hists, background_hists)
+    ]
+    hue_share = card_hists[0] / max(card_hists[0].sum(), 1)
+    low_side, high_side = hue_share[: WRAP_HUES + 1].sum(), hue_share[180 - WRAP_HUES :].sum()
+    if min(low_side, high_side) >= WRAP_SHARE:
+        ## keep the side of the hue circle with more of the card on purpose, and say how much of the card is lost
+        offset = 0 if low_side >= high_side else 90
+        start, end = best_channel_range(card_hists[0][offset : offset + 90], background_hists[0][offset : offset + 90], background_weight)
+        bounds[0] = (start + offset, end + offset)
+        lost = 1 - hue_share[bounds[0][0] : bounds[0][1] + 1].sum()
+        print(
+            f"[INFO] The hue of this card is split across the ends of the hue channel ({low_side:.0%} at 0-{WRAP_HUES}, {high_side:.0%} at {180 - WRAP_HUES}-179), "
+            f"which one range cannot cover. The range keeps the larger side ({bounds[0][0]}-{bounds[0][1]}) and loses {lost:.0%} of the card; "
+            f"sample the card again to save a second profile for the other side if that is too much"
+        )
+    lower_range = np.array([bound[0] for bound in bounds])
+    upper_range = np.array([bound[1] for bound in bounds])
+    return lower_range, upper_range
+
+
+## collect HSV histograms of the card (inside the box) and the background (outside the box) over a few seconds of frames
+def sample_card_histograms(cap, box, duration=3.0, window_title="Sampling: keep the card in the box"):
+    x, y, w, h = box
+    card_mask = None
+    card_hists = [np.zeros(180), np.zeros(256), np.zeros(256)]
+    background_hists = [np.zeros(180), np.zeros(256), np.zeros(256)]
+    bins = [180, 256, 256]
+    end_time = time.time() + duration
+    num_frames = 0
+    while time.time() < end_time:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame = fit_frame(frame, 640, 480)
+        if card_mask is None:
+            card_mask = np.zeros(frame.shape[:2], dtype=np.uint8)
+            card_mask[y : y + h, x : x + w] = 255
+            background_mask = cv2.bitwise_not(card_mask)
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        for channel in range(3):
+            card_hists[channel] += cv2.calcHist([hsv], [channel], card_mask, [bins[channel]], [0, bins[channel]]).ravel()
+            background_hists[channel] += cv2.calcHist([hsv], [channel], background_mask, [bins[channel]], [0, bins[channel]]).ravel()
+        num_frames += 1
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+        cv2.imshow(window_title, frame)
+        cv2.waitKey(1)
+    cv2.destroyWindow(window_title)
+    print(f"[INFO] Sampled {num_frames} frames")
+    return card_hists, background_hists
+
+
+def auto_hsv_color_range(duration=3.0, background_weight=1.0):
+    cap = open_camera(0, 640, 480)
+    print_camera_report(camera_report(cap), 640, 480)
+    colour_profile = Path('color_ranges.json')
+    colour_profile.unlink(missing_ok=True)
+    lower_range, upper_range = None, None
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame = fit_frame(frame, 640, 480)
+        box = cv2.selectROI("Drag a box around the card, ENTER to sample, ESC to exit", frame, showCrosshair=False)
+        cv2.destroyAllWindows()
+        if box[2] == 0 or box[3] == 0:
+            break
+        card_hists, background_hists = sample_card_histograms(cap, box, duration)
+        lower_range, upper_range = derive_hsv_range(card_hists, background_hists, background_weight)
+        print(f"[INFO] Lower bound {lower_range.tolist()} and upper bound {upper_range.tolist()}")
+        ## check how well the range separates the card from the background on a new frame
+        ret, frame = cap.read()
+        if ret:
+            frame = fit_frame(frame, 640, 480)
+            mask = cv2.inRange(cv2.cvtColor(frame, cv2.COLOR_BGR2HSV), lower_range, upper_range)
+            x, y, w, h = box
+            card_pixels = np.count_nonzero(mask[y : y + h, x : x + w])
+            background_pixels = np.count_nonzero(mask) - card_pixels
+            ## the box may cover the whole frame, then there is no background to check
+            box_size = mask[y : y + h, x : x + w].size
+            background_size = mask.size - box_size
+            print(
+                f"[INFO] This range keeps {card_pixels / box_size if box_size else 0:.0%} of the box and "
+                + (f"{background_pixels / background_size:.0%} of the background" if background_size else "there is no background outside the box")
+            )
+        save_color_range(lower_range, upper_range)
+
+    cap.release()
+    cv2.destroyAllWindows()
+
+    return lower_range, upper_range
+
+
 def nothing(x):
     pass
 
 
 if __name__ == "__main__":
-    lower_range, upper_range = hsv_color_range()
+    ap = argparse.ArgumentParser()
+    ap.add_argument(
+        "-a",
+        "--auto_calibrate",
+        action='store_true',
+        help="Whether to estimate the colour range from a box drawn around the card or not. If it's  not provided, the trackbars are used",
+    )
+    ap.add_argument(
+        "-d",
+        "--duration",
+        type=float,
+        default=3.0,
+        help="How many seconds of frames to sample for each card in auto-calibration",
+    )
+    args = ap.parse_args()
+    if args.auto_calibrate:
+        lower_range, upper_range = auto_hsv_color_range(args.duration)
+    else:
+        lower_range, upper_range = hsv_color_range()
     print("The lower bound of the threshold:", lower_range)
     print("The upper bound of the threshold:", upper_range)
@@ -0,0 +1,255 @@
+import numpy as np
+import cv2
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+"""
+Colour tracker: the same colour tracking as color_track in tutorials.py, without allocating new images at every frame.
+color_track creates a new HSV image, a new mask and a thresholded copy of the mask for every colour at every frame.
+At 120 frames per second that is a lot of memory to allocate and free, which makes the frame time jump around.
+The tracker allocates these images once, for the size of the camera frame, and lets OpenCV write into them through the dst argument.
+The HSV image is shared by all colours, so it is only computed once per frame.
+
+Only the contours found by cv2.findContours are still new at every frame, as their number and length depend on what the camera sees.
+The tracker counts the bytes it had to allocate for images (frame_bytes_allocated, zero once the buffers exist) and for contours (contour_bytes) in the last frame.
+
+For big camera frames (1080p, 4K), the tracker can split every frame into horizontal stripes and process them on several threads (stripes=4).
+The counts and areas are the same as when the whole frame is processed at once. Run this code to compare both on your PC.
+"""
+
+
+class ColorTracker:
+    ## stripes > 1 splits every frame into horizontal stripes that are processed on a pool of threads (see _track_stripes)
+    def __init__(self, lower_ranges, upper_ranges, min_area=10, max_area=300, stripes=1, overlap=16):
+        self.lower_ranges = [np.asarray(lower_range, dtype=np.uint8) for lower_range in lower_ranges]
+        self.upper_ranges = [np.asarray(upper_range, dtype=np.uint8) for upper_range in upper_ranges]
+        ## based on the size of area you saw when identifying right colour for tracking
+        self.min_area = min_area
+        self.max_area = max_area
+        self.stripes = stripes
+        self.overlap = max(1, overlap)
+        self.executor = ThreadPoolExecutor(max_workers=stripes) if stripes > 1 else None
+        self.hsv = None
+        self.masks = []
+        self.scratches = []
+        ## centre (x, y) of the detected contours of every colour in the last frame, weighted by their area; NaN when nothing was detected
+        self.centroids = []
+        self.frame_bytes_allocated = 0
+        self.contour_bytes = 0
+        self.total_frame_bytes_allocated = 0
+        self.num_frames = 0
+
+    def _allocate(self, shape):
+        self.hsv = np.empty(shape, dtype=np.uint8)
+        self.masks = [np.empty(shape[:2], dtype=np.uint8) for _ in self.lower_ranges]
+        self.scratches = [np.empty(shape[:2], dtype=np.uint8) for _ in self.lower_ranges]
+        return self.hsv.nbytes + sum(mask.nbytes for mask in self.masks) + sum(scratch.nbytes for scratch in self.scratches)
+
+    def _count(self, result, buffer):
+        ## OpenCV returns the dst buffer itself when it could write into it, otherwise a newly allocated image
+        return 0 if result is buffer else result.nbytes
+
+    ## the pixel-by-pixel part of the tracking for the rows top to bottom: HSV conversion, mask and thresholded copy of every colour
+    def _segment_rows(self, img, top, bottom):
+        allocated = 0
+        hsv = self.hsv[top:bottom]
+        allocated += self._count(cv2.cvtColor(img[top:bottom], cv2.COLOR_BGR2HSV, dst=hsv), hsv)
+        for lower_range, upper_range, mask, scratch in zip(self.lower_ranges, self.upper_ranges, self.masks, self.scratches):
+            mask = mask[top:bottom]
+            scratch = scratch[top:bottom]
+            allocated += self._count(cv2.inRange(hsv, lower_range, upper_range, dst=mask), mask)
+            ## the mask is kept as it is (for example to show it) and the contours are searched in the scratch copy
+            _, mask1 = cv2.threshold(mask, 254, 255, cv2.THRESH_BINARY, dst=scratch)
+            allocated += self._count(mask1, scratch)
+        return allocated
+
+    ## number and total area of the contours within min_area and max_area, and their centroid
+    def _summarise(self, cnts, areas):
+        detected = [(c, area) for c, area in zip(cnts, areas) if area > self.min_area and area < self.max_area]
+        OutArea = [area for _, area in detected]
+        centroid = (np.nan, np.nan)
+        if detected:
+            moments = [cv2.moments(c) for c, _ in detected]
+            centroid = tuple(
+                sum(area * m[key] / m["m00"] for m, area in zip(moments, OutArea)) / sum(OutArea) for key in ("m10", "m01")
+            )
+        return (len(OutArea), sum(OutArea)), centroid
+
+    ## input: frame in BGR, output: a list with the number and the total area of the detected contours for every colour
+    def track(self, img):
+        allocated = 0
+        if self.hsv is None or self.hsv.shape != img.shape:
+            allocated += self._allocate(img.shape)
+        if self.executor is not None:
+            results, self.centroids, stripe_allocated, contour_bytes = self._track_stripes(img)
+            allocated += stripe_allocated
+        else:
+            allocated += self._segment_rows(img, 0, img.shape[0])
+            contour_bytes = 0
+            summaries = []
+            for scratch in self.scratches:
+                cnts, hierarchy = cv2.findContours(scratch, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+                contour_bytes += sum(c.nbytes for c in cnts) + (hierarchy.nbytes if hierarchy is not None else 0)
+                summaries.append(self._summarise(cnts, [cv2.contourArea(c) for c in cnts]))
+            results = [result for result, _ in summaries]
+            self.centroids = [centroid for _, centroid in summaries]
+        self.frame_bytes_allocated = allocated
+        self.contour_bytes = contour_bytes
+        self.total_frame_bytes_allocated += allocated
+        self.num_frames += 1
+        return results
+
+    ## stripe-parallel tracking for big camera frames. OpenCV releases the GIL, so the stripes really run at the same time.
+    ## 1. the pixel-by-pixel part is done per stripe, straight into the shared images
+    ## 2. the contours are searched per stripe in a window that reaches a few rows (overlap) into the neighbouring stripes.
+    ##    Every contour belongs to the stripe that holds its top row, so no contour is counted twice (see _stripe_areas)
+    def _track_stripes(self, img):
+        height = img.shape[0]
+        bounds = [(height * k // self.stripes, height * (k + 1) // self.stripes) for k in range(self.stripes)]
+        allocated = sum(self.executor.map(lambda rows: self._segment_rows(img, *rows), bounds))
+        jobs = [
+            self.executor.submit(self._stripe_areas, scratch, top, bottom)
+            for scratch in self.scratches
+            for top, bottom in bounds
+        ]
+        results = []
+        centroids = []
+        contour_bytes = 0
+        for k in range(len(self.scratches)):
+            cnts = []
+            areas = []
+            for job in jobs[k * self.stripes : (k + 1) * self.stripes]:
+                stripe_cnts, stripe_areas, stripe_bytes = job.result()
+                cnts += stripe_cnts
+                areas += stripe_areas
+                contour_bytes += stripe_bytes
+            result, centroid = self._summarise(cnts, areas)
+            results.append(result)
+            centroids.append(centroid)
+        return results, centroids, allocated, contour_bytes
+
+    ## the contours (in the coordinates of the whole mask) and areas of the contours whose top row lies in the rows top to bottom of the mask,
+    ## exactly as findContours on the whole mask finds them
+    ## A contour is complete when it does not touch the cut edges of the window. When a contour of this stripe touches the bottom cut,
+    ## it may continue further down, and the window grows downwards until it does not.
+    ## With RETR_EXTERNAL, a blob inside the hole of another blob is not counted. The window can only miss such a hole when the enclosing
+    ## blob is cut by the window, and then the cut parts of it are found on both sides of the inner blob: in that case the window grows both ways.
+    def _stripe_areas(self, mask, top, bottom):
+        height = mask.shape[0]
+        window_top = max(0, top - self.overlap)
+        window_bottom = min(height, bottom + self.overlap)
+        while True:
+            cnts, hierarchy = cv2.findContours(mask[window_top:window_bottom], cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+            owned = []
+            cut = []
+            grow_down = False
+            for c in cnts:
+                x, y, w, h = cv2.boundingRect(c)
+                y += window_top
+                touches_top = window_top > 0 and y == window_top
+                touches_bottom = window_bottom < height and y + h == window_bottom
+                if touches_top or touches_bottom:
+                    cut.append((x, y, w, h))
+                ## a contour that touches the top cut starts above the window and belongs to a stripe above
+                if top <= y < bottom and not touches_top:
+                    if touches_bottom:
+                        grow_down = True
+                        break
+                    owned.append((c, x, y, w, h))
+            if grow_down:
+                window_bottom = min(height, window_bottom + (window_bottom - window_top))
+                continue
+            enclosed = any(
+                any(cut_x < x and cut_y < y + h and cut_y + cut_h > y for cut_x, cut_y, cut_w, cut_h in cut)
+                and any(cut_x + cut_w > x + w and cut_y < y + h and cut_y + cut_h > y for cut_x, cut_y, cut_w, cut_h in cut)
+                for _, x, y, w, h in owned
+            )
+            if enclosed:
+                window_top = max(0, window_top - (window_bottom - window_top))
+                window_bottom = min(height, window_bottom + (window_bottom - window_top))
+                continue
+            contour_bytes = sum(c.nbytes for c, *_ in owned) + (hierarchy.nbytes if hierarchy is not None else 0)
+            ## shift the contours from the window to the whole mask, so that their centroids are right
+            return [c + (0, window_top) for c, *_ in owned], [cv2.contourArea(c) for c, *_ in owned], contour_bytes
+
+
+## motion gate: a cheap check whether the scene changed since the last frame that was tracked
+## the frame is shrunk to a thumbnail (32x24 by default) and compared with the thumbnail of the last tracked frame.
+## When no cell of the thumbnail changed by more than the threshold, the frame does not need to be tracked again and the last result can be reused.
+## The largest difference of a cell is used, not the mean over the whole thumbnail: a card covers only a few cells (a 480x360 frame has 15x15 pixels per cell),
+## so a card appearing or moving changes those cells a lot but hardly changes the mean, while camera noise is averaged out within every cell.
+## Comparing with the last tracked frame (not simply the previous frame) makes sure that slow changes add up and are noticed.
+class MotionGate:
+    def __init__(self, size=(32, 24), threshold=6.0):
+        self.size = size
+        self.threshold = threshold
+        self.thumbnail = None
+        self.reference = None
+        self.difference = None
+        self.num_checked = 0
+        self.num_skipped = 0
+
+    ## input: frame in BGR, output: True when the frame should be tracked
+    def changed(self, frame):
+        self.num_checked += 1
+        if self.thumbnail is None:
+            self.thumbnail = np.empty((self.size[1], self.size[0], 3), dtype=np.uint8)
+            self.difference = np.empty_like(self.thumbnail)
+        cv2.resize(frame, self.size, dst=self.thumbnail, interpolation=cv2.INTER_AREA)
+        if self.reference is None:
+            self.reference = self.thumbnail.copy()
+            return True
+        cv2.absdiff(self.thumbnail, self.reference, dst=self.difference)
+        ## largest difference of any cell in any of the 3 colour channels
+        if cv2.minMaxLoc(self.difference.reshape(self.size[1], -1))[1] < self.threshold:
+            self.num_skipped += 1
+            return False
+        np.copyto(self.reference, self.thumbnail)
+        return True
+
+    @property
+    def skip_ratio(self):
+        return self.num_skipped / self.num_checked if self.num_checked else 0.0
+
+
+if __name__ == "__main__":
+    ## a synthetic frame with many blobs of two colours, some of them large rings with blobs inside
+    rng = np.random.default_rng(0)
+    lower_ranges = [(110, 100, 100), (50, 100, 100)]
+    upper_ranges = [(130, 255, 255), (70, 255, 255)]
+    colours = [(255, 0, 0), (0, 255, 0)]#blue and green in BGR
+    for name, (width, height) in (("720p", (1280, 720)), ("1080p", (1920, 1080)), ("4K", (3840, 2160))):
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        for _ in range(400):
+            centre = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+            colour = colours[int(rng.integers(0, 2))]
+            radius = int(rng.integers(2, 12))
+            cv2.circle(frame, centre, radius, colour, -1)
+        for _ in range(10):
+            centre = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+            cv2.circle(frame, centre, int(rng.integers(50, 300)), colours[0], 8)
+        for tracker_name, stripes in (("serial", 1), ("4 stripes", 4)):
+            tracker = ColorTracker(lower_ranges, upper_ranges, max_area=1e9, stripes=stripes)
+            results = tracker.track(frame)
+            centroids = np.round(tracker.centroids, 1).tolist()
+            start = time.perf_counter()
+            for _ in range(10):
+                tracker.track(frame)
+            elapsed = (time.perf_counter() - start) / 10
+            print(f"{name} {tracker_name}: {elapsed * 1000:.1f} ms per frame, counts and areas {results}, centroids {centroids}")
+
+    ## the motion gate has to notice a single card appearing or disappearing on a noisy camera frame of the game size, and nothing else
+    background = np.full((360, 480, 3), 60, dtype=np.uint8)
+    def noisy(frame):
+        return np.clip(frame + rng.normal(0, 4, frame.shape), 0, 255).astype(np.uint8)
+    tracker = ColorTracker(lower_ranges, upper_ranges)
+    gate = MotionGate()
+    gate.changed(noisy(background))
+    one_card = background.copy()
+    cv2.rectangle(one_card, (202, 142), (216, 156), colours[0], -1)#15x15 pixels, across 4 cells of the thumbnail
+    two_cards = one_card.copy()
+    cv2.rectangle(two_cards, (322, 202), (336, 216), colours[0], -1)
+    for name, frame in (("noise", background), ("one card", one_card), ("noise", one_card), ("two cards", two_cards), ("card removed", one_card)):
+        frame = noisy(frame)
+        print(f"motion gate, {name}: changed {gate.changed(frame)}, tracked {tracker.track(frame)}")
@@ -0,0 +1,167 @@
+import numpy as np
+from pong_game import WIDTH, HEIGHT
+
+
+"""
+Game state: the whole state of a game in one small, flat array of numbers, so that it can be copied, changed and put back cheaply.
+In the game, the state is spread over the Ball and Striker objects, the scores and the pygame Rects used for collisions.
+snapshot() writes everything that changes during a game into an int32 array, restore() puts such an array back into the objects (and their Rects).
+Copying a state, or copying it into thousands of rows at once to try different moves, is then a plain memory copy (np.copyto).
+
+Layout of the state of a game with n balls (5 + 5 * n numbers):
+frame, left score, right score, y of the left striker, y of the right striker, then for every ball: x, y, x_fac, y_fac, infield
+Everything that does not change during a game (sizes, speeds, lanes) is not in the state; VectorGame reads it once from the objects.
+
+VectorGame plays one frame of the rules of pong_game.py (the same as Match.step) on many states at once, one state per row,
+which is what a lookahead AI needs to try many moves in the time of one frame (see lookahead_ai.py). Run this code to check that both give the same games.
+"""
+
+FRAME, SCORE_L, SCORE_R, STRIKER_L, STRIKER_R = range(5)
+BALLS = 5
+BALL_FIELDS = 5
+BALL_X, BALL_Y, BALL_X_FAC, BALL_Y_FAC, BALL_INFIELD = range(BALL_FIELDS)
+
+
+def state_size(num_balls):
+    return BALLS + BALL_FIELDS * num_balls
+
+
+## column of a field of ball i in the state
+def ball_column(i, field):
+    return BALLS + BALL_FIELDS * i + field
+
+
+## strikers: [left striker, right striker], scores: [left score, right score]
+def snapshot(strikers, balls, scores, frame=0, out=None):
+    if out is None:
+        out = np.empty(state_size(len(balls)), dtype=np.int32)
+    values = [frame, scores[0], scores[1], strikers[0].posy, strikers[1].posy]
+    for ball in balls:
+        values += [ball.posx, ball.posy, ball.x_fac, ball.y_fac, ball.infield]
+    out[:] = values
+    return out
+
+
+## puts the state back into the objects; returns the scores and the frame
+def restore(state, strikers, balls):
+    strikers[0].posy = int(state[STRIKER_L])
+    strikers[1].posy = int(state[STRIKER_R])
+    for i, ball in enumerate(balls):
+        ball.posx, ball.posy, ball.x_fac, ball.y_fac, infield = (int(value) for value in state[ball_column(i, 0) : ball_column(i + 1, 0)])
+        ball.infield = bool(infield)
+        ball.update_rect()
+    return [int(state[SCORE_L]), int(state[SCORE_R])], int(state[FRAME])
+
+
+class VectorGame:
+    def __init__(self, strikers, balls, ball_collision=False):
+        self.strikers = [
+            (striker._posx, striker.width, striker.height, striker.speed, striker.lane[0], striker.lane[1] - striker.height)
+            for striker in strikers
+        ]
+        self.balls = [(ball.radius, ball.speed) for ball in balls]
+        self.ball_collision = ball_collision and len(balls) == 2
+
+    ## the y_fac of a striker played by AI_controller (one ball) or AI_controller_2balls (two balls) in every state
+    def reference_moves(self, states, side, buffer_distance=10):
+        striker_x = self.strikers[side][0]
+        striker_y = states[:, STRIKER_L + side]
+        target = states[:, ball_column(0, BALL_Y)]
+        moves = np.ones(len(states), dtype=np.int32)
+        if len(self.balls) == 2:
+            distance = [
+                (states[:, ball_column(i, BALL_X)] - striker_x) ** 2 + (states[:, ball_column(i, BALL_Y)] - striker_y) ** 2
+                for i in range(2)
+            ]
+            target = np.where(distance[1] < distance[0], states[:, ball_column(1, BALL_Y)], target)
+            ## AI_controller_2balls does not move when both balls are equally far away
+            moves[distance[0] == distance[1]] = 0
+        difference = target - striker_y
+        return moves * ((difference > buffer_distance).astype(np.int32) - (difference < -buffer_distance))
+
+    ## play one frame in every row of states (in place), with the given y_fac of the left and the right striker in every row
+    def step(self, states, strikerL_y_fac, strikerR_y_fac):
+        for column, y_fac, (_, _, _, speed, lowest, highest) in zip((STRIKER_L, STRIKER_R), (strikerL_y_fac, strikerR_y_fac), self.strikers):
+            np.clip(states[:, column] + speed * y_fac, lowest, highest, out=states[:, column])
+        if self.ball_collision:
+            self._bounce(states)
+        for i, (radius, speed) in enumerate(self.balls):
+            x = states[:, ball_column(i, BALL_X)]
+            y = states[:, ball_column(i, BALL_Y)]
+            x_fac = states[:, ball_column(i, BALL_X_FAC)]
+            y_fac = states[:, ball_column(i, BALL_Y_FAC)]
+            infield = states[:, ball_column(i, BALL_INFIELD)]
+            ## the rect of the ball clipped to the field (Ball.update_rect) against the rect of every striker, like pygame.Rect.colliderect
+            left, right = np.maximum(x - radius, 0), np.minimum(x + radius, WIDTH)
+            top, bottom = np.maximum(y - radius, 0), np.minimum(y + radius, HEIGHT)
+            in_field = (right > left) & (bottom > top)
+            for column, (striker_x, width, height, *_) in zip((STRIKER_L, STRIKER_R), self.strikers):
+                striker_y = states[:, column]
+                hit = in_field & (left < striker_x + width) & (right > striker_x) & (top < striker_y + height) & (bottom > striker_y)
+                np.negative(x_fac, out=x_fac, where=hit)
+            ## Ball.update
+            x += speed * x_fac
+            y += speed * y_fac
+            np.negative(y_fac, out=y_fac, where=(y <= 0) | (y >= HEIGHT))
+            point_right = (x <= 0) & (infield > 0)
+            point_left = (x >= WIDTH) & (infield > 0) & ~point_right
+            states[:, SCORE_R] += point_right
+            states[:, SCORE_L] += point_left
+            ## Ball.reset after a point
+            scored = point_left | point_right
+            if scored.any():
+                x[scored] = WIDTH // 2
+                y[scored] = HEIGHT // 2
+                x_fac[scored] *= -1
+        states[:, FRAME] += 1
+
+    ## Ball.bounce between the two balls
+    def _bounce(self, states):
+        (radius1, speed1), (radius2, speed2) = self.balls
+        dx = states[:, ball_column(1, BALL_X)] - states[:, ball_column(0, BALL_X)]
+        dy = states[:, ball_column(1, BALL_Y)] - states[:, ball_column(0, BALL_Y)]
+        dvx = speed2 * states[:, ball_column(1, BALL_X_FAC)] - speed1 * states[:, ball_column(0, BALL_X_FAC)]
+        dvy = speed2 * states[:, ball_column(1, BALL_Y_FAC)] - speed1 * states[:, ball_column(0, BALL_Y_FAC)]
+        bounce = (dx * dx + dy * dy <= (radius1 + radius2) ** 2) & (dx * dvx + dy * dvy < 0)
+        along_x = np.abs(dx) >= np.abs(dy)
+        for field, flip in ((BALL_X_FAC, bounce & along_x), (BALL_Y_FAC, bounce & ~along_x)):
+            for i in range(2):
+                states[flip, ball_column(i, field)] *= -1
+
+
+if __name__ == "__main__":
+    import time
+    from pong_match import Match
+
+    ## play the same matches with Match and VectorGame, with random moves, and compare the states after every frame
+    rng = np.random.default_rng(0)
+    for two_balls in (False, True):
+        matches = [Match(two_balls=two_balls, seed=seed) for seed in range(20)]
+        game = VectorGame(matches[0].strikers, matches[0].balls)
+        states = np.stack([match.snapshot() for match in matches])
+        for _ in range(3000):
+            y_facs = rng.integers(-1, 2, size=(2, len(matches)))
+            for match, strikerL_y_fac, strikerR_y_fac in zip(matches, *y_facs):
+                match.step(int(strikerL_y_fac), int(strikerR_y_fac))
+            game.step(states, *y_facs)
+            assert all(np.array_equal(state, match.snapshot()) for state, match in zip(states, matches))
+        print(f"[INFO] {'two balls' if two_balls else 'one ball'}: VectorGame and Match played the same 20 games of 3000 frames")
+
+    match = Match(two_balls=True, seed=0)
+    state = match.snapshot()
+    start = time.perf_counter()
+    for _ in range(10000):
+        match.snapshot(out=state)
+        match.restore(state)
+    print(f"[INFO] snapshot and restore of a Match: {(time.perf_counter() - start) / 10000 * 1e6:.1f} us")
+    ## every field of the branches is stored contiguously (one state per column of the buffer), which is what makes VectorGame fast
+    branches = np.empty((len(state), 2187), dtype=np.int32).T
+    start = time.perf_counter()
+    for _ in range(10000):
+        np.copyto(branches, state)
+    print(f"[INFO] copying the state into {len(branches)} branches: {(time.perf_counter() - start) / 10000 * 1e6:.1f} us")
+    moves = np.zeros(len(branches), dtype=np.int32)
+    start = time.perf_counter()
+    for _ in range(1000):
+        game.step(branches, moves, moves)
+    print(f"[INFO] one frame in {len(branches)} branches: {(time.perf_counter() - start) / 1000 * 1e6:.1f} us")
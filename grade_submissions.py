@@ -0,0 +1,246 @@
+import argparse
+import importlib.util
+import multiprocessing
+import multiprocessing.connection
+import os
+import sys
+import time
+import traceback
+from collections import deque
+from pathlib import Path
+import pygame
+from pong_match import Match
+from pong_game import Ball, Striker, AI_controller, AI_controller_2balls
+
+
+"""
+Grader: plays the AI_controller (and AI_controller_2balls) of many students without a window and ranks them.
+Every submission is a python file with the functions of Task 1-2 and Task 2-1 in tutorials.py (a copy of tutorials.py works).
+It plays seeded matches on both sides of the field against every reference opponent:
+'reference' is the PC player of pong_game.py, 'still' is a striker that never moves (a controller that works should beat it easily).
+
+Every submission runs in its own process, so a submission that crashes or changes the game code cannot affect the others,
+and several submissions are graded at the same time on all cores of the PC.
+The controllers of a submission get copies of the balls and of its striker at every frame, so moving a ball or the striker in the controller does not change the match:
+the striker only moves by the y_fac the controller returns.
+A match that takes longer than the timeout (for example an endless loop in the controller, or in the import of the submission) is stopped,
+and it and all remaining matches of that submission count as lost, so one endless loop cannot hold up the grading of the class.
+When the process of a submission stops for another reason, only that match is lost and the remaining matches go on in a new process.
+A controller that raises an error also loses the match.
+Whatever the submissions print is not shown.
+
+python grade_submissions.py submissions/ -b
+"""
+
+
+## a striker that never moves, the easiest opponent
+def still_controller(*balls_and_striker):
+    return 0
+
+
+## name: (controller with one ball, controller with two balls)
+REFERENCE_OPPONENTS = {
+    "reference": (AI_controller, AI_controller_2balls),
+    "still": (still_controller, still_controller),
+}
+
+
+def find_submissions(paths):
+    submissions = []
+    for path in map(Path, paths):
+        submissions += sorted(path.glob("*.py")) if path.is_dir() else [path]
+    return submissions
+
+
+def load_submission(path):
+    spec = importlib.util.spec_from_file_location("submission", path)
+    submission = importlib.util.module_from_spec(spec)
+    ## the submission may import files that lie next to it
+    sys.path.insert(0, str(Path(path).parent))
+    spec.loader.exec_module(submission)
+    return submission
+
+
+## copies of a ball and a striker for the controllers of a submission: whatever the controller changes in them does not change the match
+def copy_ball(ball):
+    copy = Ball(ball.posx, ball.posy, ball.radius, ball.speed, pygame.Color(ball.color))
+    copy.x_fac, copy.y_fac, copy.infield = ball.x_fac, ball.y_fac, ball.infield
+    return copy
+
+
+def copy_striker(striker):
+    return Striker(striker._posx, striker.posy, striker.width, striker.height, striker.speed, pygame.Color(striker.color), striker.lane)
+
+
+## play one match of the submission against a reference opponent; returns the points of the submission and of the opponent
+def play_match(submission, job):
+    match = Match(two_balls=job["two_balls"], seed=job["seed"])
+    own, other = (match.strikerL, match.strikerR) if job["side"] == 0 else (match.strikerR, match.strikerL)
+    opponent = REFERENCE_OPPONENTS[job["opponent"]][1 if job["two_balls"] else 0]
+    for _ in range(job["frames"]):
+        if job["two_balls"]:
+            own_y_fac = submission.AI_controller_2balls(copy_ball(match.ball), copy_ball(match.ball2), copy_striker(own))
+            other_y_fac = opponent(match.ball, match.ball2, other)
+        else:
+            own_y_fac = submission.AI_controller(copy_ball(match.ball), copy_striker(own))
+            other_y_fac = opponent(match.ball, other)
+        ## a striker cannot move faster than its speed
+        own_y_fac = max(-1, min(1, own_y_fac))
+        if job["side"] == 0:
+            match.step(own_y_fac, other_y_fac)
+        else:
+            match.step(other_y_fac, own_y_fac)
+    side = job["side"]
+    return match.scores[side], match.scores[1 - side]
+
+
+## runs in the process of a submission: plays the matches one after the other and sends every result to the grader
+def run_submission(path, jobs, connection):
+    sys.stdout = open(os.devnull, "w")
+    try:
+        submission = load_submission(path)
+    except BaseException:
+        connection.send(("load_error", traceback.format_exc(limit=-1).strip().splitlines()[-1]))
+        return
+    for job in jobs:
+        try:
+            connection.send(("points", play_match(submission, job)))
+        except Exception:
+            connection.send(("error", traceback.format_exc(limit=-1).strip().splitlines()[-1]))
+
+
+class Grade:
+    def __init__(self, path):
+        self.path = path
+        self.name = Path(path).stem
+        self.results = []#(job, points, opponent points) of every match that was played to the end
+        self.failures = []#(job, reason)
+
+    def add_failure(self, job, reason):
+        self.failures.append((job, reason))
+
+    def score(self, opponent=None):
+        wins = sum(
+            1 if points > opponent_points else 0.5 if points == opponent_points else 0
+            for job, points, opponent_points in self.results
+            if opponent is None or job["opponent"] == opponent
+        )
+        ## failed matches count as lost
+        num_matches = sum(1 for job, *_ in self.results + self.failures if opponent is None or job["opponent"] == opponent)
+        return wins / num_matches if num_matches else 0.0
+
+    @property
+    def points_difference(self):
+        return sum(points - opponent_points for _, points, opponent_points in self.results)
+
+
+class Worker:
+    def __init__(self, grade, jobs, timeout):
+        self.grade = grade
+        self.jobs = deque(jobs)
+        self.timeout = timeout
+        self.connection, child_connection = multiprocessing.Pipe(duplex=False)
+        self.process = multiprocessing.Process(
+            target=run_submission, args=(grade.path, list(jobs), child_connection), daemon=True
+        )
+        self.process.start()
+        child_connection.close()
+        ## the first match also includes loading the submission
+        self.deadline = time.perf_counter() + timeout
+
+    ## handle the next message of the process; returns False when the process is done
+    def receive(self):
+        try:
+            kind, value = self.connection.recv()
+        except EOFError:
+            ## the process ended before playing all its matches, for example with sys.exit() or a crash of python itself
+            if self.jobs:
+                self.grade.add_failure(self.jobs.popleft(), "stopped")
+            return False
+        if kind == "load_error":
+            ## the submission cannot be loaded, so none of its matches can be played
+            while self.jobs:
+                self.grade.add_failure(self.jobs.popleft(), value)
+            return False
+        job = self.jobs.popleft()
+        if kind == "points":
+            self.grade.results.append((job, *value))
+        else:
+            self.grade.add_failure(job, value)
+        self.deadline = time.perf_counter() + self.timeout
+        return bool(self.jobs)
+
+    def stop(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+def grade_all(submissions, jobs, args):
+    grades = [Grade(path) for path in submissions]
+    pending = deque((grade, jobs) for grade in grades)
+    workers = []
+    num_workers = args.workers or os.cpu_count()
+    while pending or workers:
+        while pending and len(workers) < num_workers:
+            workers.append(Worker(*pending.popleft(), args.timeout))
+        ready = multiprocessing.connection.wait([worker.connection for worker in workers], timeout=0.05)
+        for worker in list(workers):
+            if worker.connection in ready:
+                if worker.receive():
+                    continue
+            elif time.perf_counter() > worker.deadline:
+                ## a controller (or the import of the submission) that hangs once would most likely hang in every match,
+                ## and each match would wait out the whole timeout: all remaining matches of the submission count as timed out at once
+                while worker.jobs:
+                    worker.grade.add_failure(worker.jobs.popleft(), "timeout")
+            else:
+                continue
+            worker.stop()
+            workers.remove(worker)
+            ## after a crash (not a timeout), go on with the remaining matches in a new process
+            if worker.jobs:
+                pending.appendleft((worker.grade, list(worker.jobs)))
+    return grades
+
+
+def print_report(grades):
+    opponents = list(REFERENCE_OPPONENTS)
+    header = "rank | submission           | win rate | " + " | ".join(f"vs {name:>9}" for name in opponents) + " | points difference | failed matches"
+    print(header)
+    print("-" * len(header))
+    ranked = sorted(grades, key=lambda grade: (grade.score(), grade.points_difference), reverse=True)
+    for rank, grade in enumerate(ranked, 1):
+        per_opponent = " | ".join(f"{grade.score(name):>12.0%}" for name in opponents)
+        print(
+            f"{rank:>4} | {grade.name[:20]:<20} | {grade.score():>8.0%} | {per_opponent} | "
+            f"{grade.points_difference:>17} | {len(grade.failures):>14}"
+        )
+    for grade in ranked:
+        if grade.failures:
+            ## the first reason is usually the one to fix
+            reasons = sorted({reason for _, reason in grade.failures})
+            print(f"[INFO] {grade.name}: {len(grade.failures)} failed matches ({'; '.join(reasons)})")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("submissions", nargs="+", help="Python files of the submissions, or folders with one python file per submission")
+    ap.add_argument("-b", "--two_balls", action='store_true', help="Whether to grade AI_controller_2balls with two balls or not. If it's  not provided, AI_controller is graded with one ball")
+    ap.add_argument("-m", "--matches", type=int, default=5, help="How many matches (with different seeds) to play on each side against every opponent")
+    ap.add_argument("-f", "--frames", type=int, default=3000, help="How many frames every match lasts")
+    ap.add_argument("-t", "--timeout", type=float, default=10.0, help="Seconds after which a match is stopped and counts as lost")
+    ap.add_argument("-w", "--workers", type=int, help="How many submissions to grade at the same time. If it's  not provided, all cores are used")
+    args = ap.parse_args()
+    submissions = find_submissions(args.submissions)
+    jobs = [
+        {"opponent": opponent, "two_balls": args.two_balls, "seed": seed, "side": side, "frames": args.frames}
+        for opponent in REFERENCE_OPPONENTS
+        for seed in range(args.matches)
+        for side in (0, 1)
+    ]
+    start = time.perf_counter()
+    grades = grade_all(submissions, jobs, args)
+    elapsed = time.perf_counter() - start
+    print_report(grades)
+    print(f"[INFO] Graded {len(submissions)} submissions ({len(submissions) * len(jobs)} matches) in {elapsed:.1f} s")
@@ -0,0 +1,128 @@
+import argparse
+import time
+import numpy as np
+from pong_game import HEIGHT, AI_controller, AI_controller_2balls
+from game_state import snapshot, state_size, ball_column, VectorGame, SCORE_L, STRIKER_L, BALL_X, BALL_Y, BALL_X_FAC, BALL_Y_FAC
+
+
+"""
+Lookahead AI: a PC player that plans its moves by trying them, instead of following a fixed rule like AI_controller.
+At every frame, it copies the state of the game (see game_state.py) and plays it forward with every sequence of moves of its striker:
+the first move (up, stay or down) is held for a few frames (segment_frames), then the game branches again into 3 moves, and so on.
+After 7 segments that is 3**7 = 2187 branches, all played at the same time by VectorGame. The opponent is expected to play like AI_controller.
+The search stops when the time budget of the frame is used up, and the AI takes the first move of the best branch:
+the branch that wins most points, or else the one whose striker is nearest to where the coming ball will reach its side.
+
+Run this code to see how it plays against the PC player of pong_game.py: python lookahead_ai.py -b
+"""
+
+## the order of the moves decides between equally good branches: staying comes first
+MOVES = np.array([0, -1, 1], dtype=np.int32)
+
+
+class LookaheadAI:
+    ## strikers: [left striker, right striker], side: 0 to play the left striker, 1 to play the right striker
+    def __init__(self, strikers, balls, side=0, time_budget=0.004, segment_frames=4, max_segments=7, buffer_distance=10, ball_collision=False):
+        self.strikers = strikers
+        self.balls = balls
+        self.side = side
+        self.time_budget = time_budget
+        self.segment_frames = segment_frames
+        self.max_segments = max_segments
+        self.buffer_distance = buffer_distance
+        self.game = VectorGame(strikers, balls, ball_collision)
+        self.state = np.empty(state_size(len(balls)), dtype=np.int32)
+        striker = strikers[side]
+        ## the x where a ball reaches the striker, and the x_fac of a ball coming towards it
+        self.face_x = striker._posx + striker.width if side == 0 else striker._posx
+        self.coming = -1 if side == 0 else 1
+        self.half_height = striker.height / 2
+        ## statistics: decisions taken, branches evaluated and frames played in all branches
+        self.num_decisions = 0
+        self.num_branches = 0
+        self.num_frames = 0
+        self.frames_ahead = 0
+
+    ## returns the y_fac of the striker for this frame
+    def decide(self, scores, frame=0):
+        deadline = time.perf_counter() + self.time_budget
+        snapshot(self.strikers, self.balls, scores, frame, out=self.state)
+        ## one state per column, so that every field of all branches is contiguous in memory
+        states = self.state[:, None]
+        first_moves = None
+        frames_ahead = 0
+        out_of_time = False
+        for segment in range(self.max_segments):
+            states = np.repeat(states, len(MOVES), axis=1)
+            moves = np.tile(MOVES, states.shape[1] // len(MOVES))
+            first_moves = moves if first_moves is None else np.repeat(first_moves, len(MOVES))
+            for _ in range(self.segment_frames):
+                other_moves = self.game.reference_moves(states.T, 1 - self.side, self.buffer_distance)
+                if self.side == 0:
+                    self.game.step(states.T, moves, other_moves)
+                else:
+                    self.game.step(states.T, other_moves, moves)
+                frames_ahead += 1
+                self.num_frames += states.shape[1]
+                if time.perf_counter() > deadline:
+                    out_of_time = True
+                    break
+            if out_of_time:
+                break
+        values = self.evaluate(states.T)
+        self.num_decisions += 1
+        self.num_branches += len(values)
+        self.frames_ahead += frames_ahead
+        return int(first_moves[np.argmax(values)])
+
+    ## how good every state is for this striker: 1000 for every point won (minus the points lost), minus the distance to the coming ball
+    def evaluate(self, states):
+        side = self.side
+        points = (states[:, SCORE_L + side] - self.state[SCORE_L + side]) - (states[:, SCORE_L + 1 - side] - self.state[SCORE_L + 1 - side])
+        centre = states[:, STRIKER_L + side] + self.half_height
+        ## without a coming ball, the striker waits in the middle of the field
+        distance = np.abs(centre - HEIGHT / 2)
+        soonest = np.full(len(states), np.inf)
+        for i, ball in enumerate(self.balls):
+            x_fac = states[:, ball_column(i, BALL_X_FAC)]
+            frames = (self.face_x - states[:, ball_column(i, BALL_X)]) / (ball.speed * x_fac)
+            coming = (x_fac == self.coming) & (frames >= 0) & (frames < soonest)
+            ## where the ball reaches the side of the striker, after bouncing off the top and the bottom of the field
+            y = np.abs(states[:, ball_column(i, BALL_Y)] + ball.speed * states[:, ball_column(i, BALL_Y_FAC)] * np.where(coming, frames, 0)) % (2 * HEIGHT)
+            y = np.where(y > HEIGHT, 2 * HEIGHT - y, y)
+            distance = np.where(coming, np.abs(centre - y), distance)
+            soonest = np.where(coming, frames, soonest)
+        return 1000 * points - distance
+
+
+if __name__ == "__main__":
+    from pong_match import Match
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-b", "--two_balls", action='store_true', help="Whether to play with two balls or not")
+    ap.add_argument("-m", "--matches", type=int, default=3, help="How many matches (with different seeds) to play")
+    ap.add_argument("-f", "--frames", type=int, default=3000, help="How many frames every match lasts")
+    ap.add_argument("-t", "--time_budget", type=float, default=4.0, help="Milliseconds the lookahead AI may think at every frame")
+    args = ap.parse_args()
+    scores = [0, 0]
+    decision_time = 0.0
+    for seed in range(args.matches):
+        match = Match(two_balls=args.two_balls, seed=seed)
+        lookahead = LookaheadAI(match.strikers, match.balls, side=0, time_budget=args.time_budget / 1000)
+        for _ in range(args.frames):
+            start = time.perf_counter()
+            strikerL_y_fac = lookahead.decide(match.scores, match.frame)
+            decision_time += time.perf_counter() - start
+            if match.ball2 is not None:
+                strikerR_y_fac = AI_controller_2balls(match.ball, match.ball2, match.strikerR)
+            else:
+                strikerR_y_fac = AI_controller(match.ball, match.strikerR)
+            match.step(strikerL_y_fac, strikerR_y_fac)
+        print(f"[INFO] match {seed}: lookahead AI {match.scores[0]} - {match.scores[1]} AI_controller")
+        scores = [scores[0] + match.scores[0], scores[1] + match.scores[1]]
+    num_decisions = args.matches * args.frames
+    print(
+        f"[INFO] in total: lookahead AI {scores[0]} - {scores[1]} AI_controller. Per frame, the lookahead AI took {decision_time / num_decisions * 1000:.2f} ms, "
+        f"looked {lookahead.frames_ahead / lookahead.num_decisions:.0f} frames ahead, evaluated {lookahead.num_branches / lookahead.num_decisions:.0f} branches "
+        f"and played {lookahead.num_frames / lookahead.num_decisions:.0f} branch-frames (last match)"
+    )
@@ -0,0 +1,107 @@
+import asyncio
+import argparse
+import struct
+import time
+import numpy as np
+from match_server import DEFAULT_PORT
+
+
+"""
+Load generator for the match server: hundreds of bot players on one PC.
+Every bot connects to the server, rebuilds the state of its match from the HELLO and DELTA messages and moves its striker towards the nearest ball,
+like AI_controller does. A bot only sends a new y_fac when it changes.
+At the end, the generator reports how many state updates the bots received and how regular they arrived.
+
+python match_loadgen.py --port 8765 -n 400 -d 30
+"""
+
+BUFFER_DISTANCE = 10
+
+
+class Bot:
+    def __init__(self):
+        self.side = None
+        self.state = None
+        self.y_fac = 0
+        self.updates = 0
+        self.gaps = []
+        self.last_update = None
+
+    def on_hello(self, payload):
+        _, _, self.side, num_fields = struct.unpack_from("<cIBB", payload)
+        self.state = np.frombuffer(payload, dtype=np.int16, count=num_fields, offset=7).copy()
+        self.field_bits = 1 << np.arange(num_fields)
+
+    def on_delta(self, payload):
+        _, _, mask = struct.unpack_from("<cIH", payload)
+        changed = (self.field_bits & mask) > 0
+        self.state[changed] = np.frombuffer(payload, dtype=np.int16, offset=7)
+        now = time.perf_counter()
+        if self.last_update is not None:
+            self.gaps.append(now - self.last_update)
+        self.last_update = now
+        self.updates += 1
+
+    ## move towards the ball that is nearest to this bot's side of the field
+    def decide(self):
+        striker_y = int(self.state[self.side])
+        striker_x = 20 if self.side == 0 else 870
+        balls = self.state[4:].reshape(-1, 2)
+        nearest = balls[np.argmin(np.abs(balls[:, 0] - striker_x))]
+        if nearest[1] > striker_y + BUFFER_DISTANCE:
+            return 1
+        if nearest[1] < striker_y - BUFFER_DISTANCE:
+            return -1
+        return 0
+
+
+async def run_bot(bot, args, stop_time):
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    try:
+        while time.perf_counter() < stop_time:
+            header = await reader.readexactly(2)
+            payload = await reader.readexactly(struct.unpack("<H", header)[0])
+            if payload[:1] == b"H":
+                bot.on_hello(payload)
+            else:
+                bot.on_delta(payload)
+            y_fac = bot.decide()
+            if y_fac != bot.y_fac:
+                bot.y_fac = y_fac
+                writer.write(struct.pack("<b", y_fac))
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def main(args):
+    bots = [Bot() for _ in range(args.num_bots)]
+    stop_time = time.perf_counter() + args.duration
+    tasks = []
+    for bot in bots:
+        tasks.append(asyncio.create_task(run_bot(bot, args, stop_time)))
+        ## connect gradually so that the server is not hit by all connections at once
+        await asyncio.sleep(args.ramp_up / args.num_bots)
+    await asyncio.gather(*tasks)
+    gaps = np.concatenate([np.array(bot.gaps) for bot in bots if bot.gaps]) * 1000 if any(bot.gaps for bot in bots) else np.zeros(1)
+    updates = sum(bot.updates for bot in bots)
+    print(
+        f"[INFO] {args.num_bots} bots received {updates} updates ({updates / args.duration:.0f}/s), "
+        f"time between updates: median {np.median(gaps):.2f} ms, p99 {np.percentile(gaps, 99):.2f} ms, max {gaps.max():.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1", help="Address of the match server")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port of the match server")
+    ap.add_argument("--unix", help="Connect to this Unix socket path instead of TCP")
+    ap.add_argument("-n", "--num_bots", type=int, default=200, help="How many bot players to connect")
+    ap.add_argument("-d", "--duration", type=float, default=30.0, help="How many seconds the bots play")
+    ap.add_argument("--ramp_up", type=float, default=2.0, help="Seconds over which the bots connect")
+    args = ap.parse_args()
+    asyncio.run(main(args))
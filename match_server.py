@@ -0,0 +1,215 @@
+import asyncio
+import argparse
+import os
+import struct
+import time
+import numpy as np
+from pong_match import Match
+from pong_game import AI_controller, AI_controller_2balls
+
+
+"""
+Match server: many pong matches at the same time, played over a local socket.
+Every client that connects takes one striker of a match. A match starts as soon as its first player arrives, and a PC player (AI_controller) plays every free striker.
+At a fixed tick rate, the server plays one frame of every match and sends the new state to the players of that match.
+
+Protocol (all numbers little-endian):
+client -> server: one signed byte per input, the y_fac of the client's striker (-1, 0 or 1). The last byte received is used until the next one arrives.
+server -> client: messages of [uint16 length][payload]
+  HELLO  b"H" uint32 match id, uint8 side (0 left, 1 right), uint8 number of fields, int16 value of every field
+  DELTA  b"D" uint32 tick, uint16 bitmask of the fields that changed, int16 value of every changed field (in field order)
+The fields are: y of the left striker, y of the right striker, left score, right score, then x and y of every ball.
+A client keeps the state from HELLO and applies every DELTA to it; fields that did not change are not sent again.
+
+Start the server, then the load generator in another terminal:
+python match_server.py --port 8765
+python match_loadgen.py --port 8765 -n 400
+"""
+
+DEFAULT_PORT = 8765
+
+
+def encode_message(payload):
+    return struct.pack("<H", len(payload)) + payload
+
+
+class Slot:
+    def __init__(self, writer):
+        self.writer = writer
+        self.y_fac = 0
+
+
+class HostedMatch:
+    def __init__(self, match_id, two_balls, seed):
+        self.match_id = match_id
+        self.match = Match(two_balls=two_balls, seed=seed)
+        self.slots = [None, None]#left, right
+        self.state = self.read_state()
+        self.field_bits = 1 << np.arange(len(self.state))
+
+    def read_state(self):
+        match = self.match
+        values = [match.strikerL.posy, match.strikerR.posy, match.scores[0], match.scores[1]]
+        for ball in match.balls:
+            values += [ball.posx, ball.posy]
+        return np.array(values, dtype=np.int16)
+
+    def hello(self, side):
+        payload = struct.pack("<cIBB", b"H", self.match_id, side, len(self.state)) + self.state.tobytes()
+        return encode_message(payload)
+
+    ## play one frame and return the delta message for the players, or None when nothing changed
+    def tick(self, tick):
+        match = self.match
+        y_facs = []
+        for side, striker in enumerate(match.strikers):
+            slot = self.slots[side]
+            if slot is not None:
+                y_facs.append(slot.y_fac)
+            elif match.ball2 is not None:
+                y_facs.append(AI_controller_2balls(match.ball, match.ball2, striker))
+            else:
+                y_facs.append(AI_controller(match.ball, striker))
+        match.step(*y_facs)
+        state = self.read_state()
+        changed = state != self.state
+        if not changed.any():
+            return None
+        mask = int(self.field_bits[changed].sum())
+        self.state = state
+        return encode_message(struct.pack("<cIH", b"D", tick, mask) + state[changed].tobytes())
+
+
+class MatchServer:
+    def __init__(self, tick_rate=60, two_balls=False, max_write_buffer=64 * 1024):
+        self.tick_interval = 1 / tick_rate
+        self.two_balls = two_balls
+        self.max_write_buffer = max_write_buffer
+        self.matches = {}
+        self.next_match_id = 0
+        self.tick = 0
+        ## statistics since the last report
+        self.jitters = []
+        self.busy_time = 0.0
+        self.bytes_sent = 0
+        self.cpu_time = time.process_time()
+
+    def join(self, writer):
+        ## fill the free striker (left or right) of a match that is waiting for a second player, or start a new match
+        ## matches without players are removed in leave, so every match found here still has a player on the other side
+        for hosted in self.matches.values():
+            for side, slot in enumerate(hosted.slots):
+                if slot is None:
+                    hosted.slots[side] = Slot(writer)
+                    return hosted, side
+        hosted = HostedMatch(self.next_match_id, self.two_balls, seed=self.next_match_id)
+        self.matches[hosted.match_id] = hosted
+        self.next_match_id += 1
+        hosted.slots[0] = Slot(writer)
+        return hosted, 0
+
+    def leave(self, hosted, side):
+        hosted.slots[side] = None
+        if hosted.slots[0] is None and hosted.slots[1] is None:
+            self.matches.pop(hosted.match_id, None)
+
+    async def handle_client(self, reader, writer):
+        hosted, side = self.join(writer)
+        slot = hosted.slots[side]
+        writer.write(hosted.hello(side))
+        try:
+            while True:
+                data = await reader.read(256)
+                if not data:
+                    break
+                slot.y_fac = max(-1, min(1, struct.unpack_from("<b", data, len(data) - 1)[0]))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.leave(hosted, side)
+            writer.close()
+
+    def broadcast(self, hosted, message):
+        for side, slot in enumerate(hosted.slots):
+            if slot is None:
+                continue
+            ## a client that does not read its messages would make the server buffer them forever: disconnect it
+            if slot.writer.transport.get_write_buffer_size() > self.max_write_buffer:
+                slot.writer.transport.abort()
+                continue
+            slot.writer.write(message)
+            self.bytes_sent += len(message)
+
+    async def run_ticks(self, report_every=5.0):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        next_report = next_tick + report_every
+        while True:
+            next_tick += self.tick_interval
+            await asyncio.sleep(max(0, next_tick - loop.time()))
+            ## how late this tick started compared with the fixed schedule
+            self.jitters.append(loop.time() - next_tick)
+            start = time.perf_counter()
+            self.tick += 1
+            for hosted in list(self.matches.values()):
+                message = hosted.tick(self.tick)
+                if message is not None:
+                    self.broadcast(hosted, message)
+            self.busy_time += time.perf_counter() - start
+            if loop.time() >= next_report:
+                self.report(report_every)
+                next_report += report_every
+            ## when the server cannot keep up, skip the missed ticks instead of running them back to back
+            if loop.time() - next_tick > self.tick_interval:
+                next_tick = loop.time()
+
+    def report(self, period):
+        jitters = np.array(self.jitters) * 1000
+        ticks_per_second = len(jitters) / period
+        busy = self.busy_time / period
+        ## the whole server (ticks and the clients' inputs) runs on one core: how much of that core was used
+        cpu_time = time.process_time()
+        cpu = (cpu_time - self.cpu_time) / period
+        num_matches = len(self.matches)
+        num_players = sum(slot is not None for hosted in self.matches.values() for slot in hosted.slots)
+        ## how many matches one fully used core could play at the full tick rate
+        matches_per_core = num_matches * ticks_per_second * self.tick_interval / cpu if cpu > 0 else 0
+        print(
+            f"[INFO] {num_matches} matches, {num_players} players, {ticks_per_second:.1f} ticks/s, "
+            f"tick jitter mean {jitters.mean():.2f} ms p99 {np.percentile(jitters, 99):.2f} ms, "
+            f"ticks {busy:.0%} and CPU {cpu:.0%} of a core, ~{matches_per_core:.0f} matches per core, {self.bytes_sent / period / 1024:.1f} KiB/s sent"
+        )
+        self.jitters = []
+        self.busy_time = 0.0
+        self.bytes_sent = 0
+        self.cpu_time = cpu_time
+
+
+async def serve(args):
+    server = MatchServer(args.tick_rate, args.two_balls)
+    if args.unix:
+        listener = await asyncio.start_unix_server(server.handle_client, path=args.unix)
+        print(f"[INFO] Match server listening on {args.unix}")
+    else:
+        listener = await asyncio.start_server(server.handle_client, args.host, args.port)
+        print(f"[INFO] Match server listening on {args.host}:{args.port}")
+    async with listener:
+        await server.run_ticks(args.report_every)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port to listen on")
+    ap.add_argument("--unix", help="Listen on this Unix socket path instead of TCP")
+    ap.add_argument("-t", "--tick_rate", type=int, default=60, help="How many frames per second every match plays")
+    ap.add_argument("-b", "--two_balls", action='store_true', help="Whether to play the matches with two balls or not")
+    ap.add_argument("-r", "--report_every", type=float, default=5.0, help="Seconds between two reports of the server statistics")
+    args = ap.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.unix and os.path.exists(args.unix):
+            os.unlink(args.unix)
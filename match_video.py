@@ -0,0 +1,198 @@
+import argparse
+import queue
+import threading
+import time
+import numpy as np
+import cv2
+import pygame
+import pong_game
+from pong_game import WIDTH, HEIGHT, BLACK, WHITE, AI_controller, AI_controller_2balls
+from pong_match import Match
+from game_state import BALLS, BALL_FIELDS
+from ball_renderer import BallRenderer
+
+
+"""
+Match video: records simulated matches as a video file, without a window and without screen capture.
+The game is drawn offscreen, straight into a NumPy image (pygame.image.frombuffer, like camera_view.py), at a fixed frame rate of the video,
+so no frame is ever dropped, however fast or slow the PC is.
+
+Encoding a frame takes longer than drawing it, so the frames are encoded by cv2.VideoWriter on a background thread.
+The game hands every frame over through a bounded queue: the frames are copied into a fixed number of buffers, which the encoder gives back once it has written them.
+While the encoder keeps up, the game never waits; when it does not, the game waits for a free buffer instead of filling the memory with frames.
+OpenCV releases the GIL while encoding, so drawing and encoding run at the same time on two cores.
+At the end, the tool reports how fast the frames were drawn and encoded, and how long the game had to wait for the encoder.
+
+Record 30 seconds of PC vs. PC with two balls, or replay a match saved with --save_states:
+python match_video.py -b -d 30 -o match.mp4 --save_states match_states.npy
+python match_video.py --replay match_states.npy -o replay.mp4
+"""
+
+
+class VideoEncoder(threading.Thread):
+    def __init__(self, path, fps, size, fourcc="mp4v", queue_size=32):
+        super().__init__(daemon=True)
+        self.writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*fourcc), fps, size)
+        if not self.writer.isOpened():
+            raise RuntimeError(f"cannot write the video {path} with the codec {fourcc}")
+        self.queue_size = queue_size
+        self.frames = queue.Queue(maxsize=queue_size)
+        ## the buffers that can be filled with the next frames; a buffer comes back here once the encoder has written it
+        self.free_buffers = queue.Queue()
+        for _ in range(queue_size):
+            self.free_buffers.put(np.empty((size[1], size[0], 3), dtype=np.uint8))
+        self.num_frames = 0
+        self.encode_time = 0.0
+        self.wait_time = 0.0
+        self.max_queued = 0
+        ## the error that stopped the encoder thread, raised again in the game by put and close
+        self.error = None
+
+    ## the encoder thread may stop with an error while the game waits for it: wait in short steps and raise its error instead of waiting forever
+    def _wait(self, wait):
+        while True:
+            if self.error is not None:
+                raise RuntimeError("the video encoder stopped") from self.error
+            try:
+                return wait(timeout=0.1)
+            except (queue.Empty, queue.Full):
+                if not self.is_alive() and self.error is None:
+                    raise RuntimeError("the video encoder stopped")
+
+    ## copy the frame (BGR) into a free buffer and queue it; waits only when all buffers are still queued
+    def put(self, frame):
+        try:
+            buffer = self.free_buffers.get_nowait()
+        except queue.Empty:
+            start = time.perf_counter()
+            buffer = self._wait(self.free_buffers.get)
+            self.wait_time += time.perf_counter() - start
+        np.copyto(buffer, frame)
+        self._wait(lambda timeout: self.frames.put(buffer, timeout=timeout))
+        self.max_queued = max(self.max_queued, self.frames.qsize())
+
+    def run(self):
+        try:
+            while True:
+                frame = self.frames.get()
+                if frame is None:
+                    break
+                start = time.perf_counter()
+                self.writer.write(frame)
+                self.encode_time += time.perf_counter() - start
+                self.num_frames += 1
+                self.free_buffers.put(frame)
+        except BaseException as error:
+            self.error = error
+        finally:
+            self.writer.release()
+
+    ## write the queued frames and close the video file
+    def close(self):
+        self._wait(lambda timeout: self.frames.put(None, timeout=timeout))
+        self.join()
+        if self.error is not None:
+            raise RuntimeError("the video encoder stopped") from self.error
+
+
+## draw the match like the game loop in pong_game.py does
+def draw_match(match, ball_renderer):
+    pong_game.screen.fill(BLACK)
+    for striker in match.strikers:
+        striker.display()
+    ball_renderer.draw_balls(pong_game.screen, match.balls)
+    match.strikerL.display_score("Konstanz Gamer : ", match.scores[0], 100, 20, WHITE)
+    match.strikerR.display_score("Collective Power : ", match.scores[1], WIDTH - 100, 20, WHITE)
+
+
+## the frames of a new match played by two PC players, one video frame every steps_per_frame frames of the game
+def play_frames(args, states=None):
+    match = Match(two_balls=args.two_balls, ball_collision=args.ball_collision, seed=args.seed)
+    lookahead = None
+    if args.lookahead:
+        from lookahead_ai import LookaheadAI
+        lookahead = LookaheadAI(match.strikers, match.balls, side=0, ball_collision=args.ball_collision)
+    for _ in range(int(args.duration * args.fps)):
+        for _ in range(args.steps_per_frame):
+            if lookahead is not None:
+                strikerL_y_fac = lookahead.decide(match.scores, match.frame)
+            elif match.ball2 is not None:
+                strikerL_y_fac = AI_controller_2balls(match.ball, match.ball2, match.strikerL)
+            else:
+                strikerL_y_fac = AI_controller(match.ball, match.strikerL)
+            if match.ball2 is not None:
+                strikerR_y_fac = AI_controller_2balls(match.ball, match.ball2, match.strikerR)
+            else:
+                strikerR_y_fac = AI_controller(match.ball, match.strikerR)
+            match.step(strikerL_y_fac, strikerR_y_fac)
+            if states is not None:
+                states.append(match.snapshot())
+        yield match
+
+
+## the frames of a match saved with --save_states (one game state per frame of the game, see game_state.py)
+def replay_frames(args):
+    states = np.load(args.replay)
+    num_balls = (states.shape[1] - BALLS) // BALL_FIELDS
+    match = Match(two_balls=num_balls == 2)
+    for state in states[args.steps_per_frame - 1 :: args.steps_per_frame]:
+        match.restore(state)
+        yield match
+
+
+def export(args):
+    canvas = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    ## the game is drawn straight into canvas
+    pong_game.init_display(pygame.image.frombuffer(canvas, (WIDTH, HEIGHT), "BGR"))
+    encoder = VideoEncoder(args.output, args.fps, (WIDTH, HEIGHT), args.fourcc, args.queue_size)
+    encoder.start()
+    ball_renderer = BallRenderer()
+    states = [] if args.save_states else None
+    frames = replay_frames(args) if args.replay else play_frames(args, states)
+    num_frames = 0
+    start = time.perf_counter()
+    for match in frames:
+        draw_match(match, ball_renderer)
+        encoder.put(canvas)
+        num_frames += 1
+    render_time = time.perf_counter() - start
+    encoder.close()
+    total_time = time.perf_counter() - start
+    if states:
+        np.save(args.save_states, np.stack(states))
+    if encoder.num_frames == 0:
+        ## for example a replay with fewer frames of the game than --steps_per_frame
+        print(f"[INFO] No frames to write, {args.output} is empty")
+        return
+    print(f"[INFO] Wrote {encoder.num_frames} frames ({encoder.num_frames / args.fps:.1f} s of video at {args.fps} fps) to {args.output}")
+    print(
+        f"[INFO] Simulation and drawing: {num_frames / render_time:.0f} frames/s (waited {encoder.wait_time:.2f} s of {render_time:.2f} s for the encoder), "
+        f"encoding: {encoder.num_frames / encoder.encode_time:.0f} frames/s, altogether {encoder.num_frames / total_time:.0f} frames/s. "
+        f"The queue held up to {encoder.max_queued} of {encoder.queue_size} frames"
+    )
+
+
+## a duration for argparse: a video without frames has no frame rates to report
+def positive_seconds(value):
+    seconds = float(value)
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError(f"the duration has to be positive: {value}")
+    return seconds
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-o", "--output", default="match.mp4", help="Video file to write")
+    ap.add_argument("-b", "--two_balls", action='store_true', help="Whether to use two ball or not. If it's  not provided, one ball is used")
+    ap.add_argument("-x", "--ball_collision", action='store_true', help="Whether the balls bounce off each other or not (with two balls)")
+    ap.add_argument("-l", "--lookahead", action='store_true', help="Whether the left striker is played by the lookahead PC player or not. If it's  not provided, AI_controller is used")
+    ap.add_argument("--seed", type=int, default=0, help="Seed of the start of the match")
+    ap.add_argument("-d", "--duration", type=positive_seconds, default=30.0, help="Seconds of video to record")
+    ap.add_argument("--fps", type=int, default=60, help="Frame rate of the video")
+    ap.add_argument("--steps_per_frame", type=int, default=2, help="Frames of the game per frame of the video. With 60 fps and 2, the video shows the game at its default speed (120 fps)")
+    ap.add_argument("--fourcc", default="mp4v", help="Codec of the video, for example mp4v or MJPG")
+    ap.add_argument("--queue_size", type=int, default=32, help="How many frames can wait for the encoder")
+    ap.add_argument("--replay", help="Record the match saved in this file by --save_states instead of playing a new one")
+    ap.add_argument("--save_states", help="Save the state of every frame of the game in this file (.npy), to replay the match later")
+    args = ap.parse_args()
+    export(args)
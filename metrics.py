@@ -0,0 +1,151 @@
+import threading
+import time
+
+
+"""
+Metrics: live numbers of the game loop and the camera pipeline while the game runs, instead of only the FPS printed at the end.
+python pong_game.py -s -c -m 9100, then open http://localhost:9100/metrics in a browser, or let Prometheus scrape it.
+
+The game loop writes its numbers into a Metrics object (frames, frame rates, time spent in every stage of a frame, stale camera frames,
+detections per colour, scores), and a small HTTP server on a background thread reads them and formats them in the Prometheus text format.
+Only the game loop ever writes the numbers and the server only reads them, so the game loop never has to take a lock:
+at worst a scrape sees a frame that is half updated, which does not matter for live statistics.
+"""
+
+## the stages of a frame of the game loop, in the order they run
+STAGES = ("camera", "tracking", "control", "physics", "draw", "wait")
+
+
+class Metrics:
+    ## smoothing: weight of the newest value in the moving averages of the frame rates and the stage times
+    def __init__(self, smoothing=0.05):
+        self.smoothing = smoothing
+        self.frames = 0
+        self.camera_frames = 0
+        self.stale_frames = 0
+        self.dropped_frames = 0
+        self.frame_age = 0.0
+        self.reused_frames = 0
+        self.frame_interval = 0.0
+        self.camera_interval = 0.0
+        self.stage_seconds = dict.fromkeys(STAGES, 0.0)
+        self.stage_seconds_total = dict.fromkeys(STAGES, 0.0)
+        self.tracker_calls = 0
+        self.tracker_seconds_total = 0.0
+        self.detections = {}
+        self.detection_area = {}
+        self.scores = {"left": 0, "right": 0}
+        self.last_frame_start = None
+        self.last_sequence = None
+        self.last_capture = None
+        self.mark = None
+
+    def _average(self, average, value):
+        return value if average == 0.0 else average + self.smoothing * (value - average)
+
+    def start_frame(self):
+        now = time.perf_counter()
+        if self.last_frame_start is not None:
+            self.frame_interval = self._average(self.frame_interval, now - self.last_frame_start)
+        self.last_frame_start = now
+        self.mark = now
+        self.frames += 1
+
+    ## the time since the last lap (or the start of the frame) was spent in this stage
+    def lap(self, stage):
+        now = time.perf_counter()
+        elapsed = now - self.mark
+        self.mark = now
+        self.stage_seconds[stage] = self._average(self.stage_seconds[stage], elapsed)
+        self.stage_seconds_total[stage] += elapsed
+
+    ## track the colours of a frame with tracker.track, and count the calls and the time spent in them alone
+    ## (the tracking stage also includes the motion gate and the camera view)
+    def track(self, tracker, frame):
+        start = time.perf_counter()
+        result = tracker.track(frame)
+        self.tracker_seconds_total += time.perf_counter() - start
+        self.tracker_calls += 1
+        return result
+
+    ## the sequence number and capture timestamp of the camera frame the game read (see ConfiguredVideoStream.read_latest)
+    ## returns whether it is a new frame; a frame that was already read is stale, and frames the game never read are dropped
+    def camera_frame(self, sequence, timestamp):
+        if sequence == self.last_sequence:
+            self.stale_frames += 1
+            return False
+        if self.last_sequence is not None:
+            self.dropped_frames += sequence - self.last_sequence - 1
+            self.camera_interval = self._average(self.camera_interval, (timestamp - self.last_capture) / (sequence - self.last_sequence))
+        self.last_sequence = sequence
+        self.last_capture = timestamp
+        self.frame_age = self._average(self.frame_age, time.perf_counter() - timestamp)
+        self.camera_frames += 1
+        return True
+
+    ## number and total area of the contours found for every colour
+    def set_detections(self, counts, areas=None):
+        for colour, count in enumerate(counts):
+            self.detections[str(colour)] = count
+            if areas is not None:
+                self.detection_area[str(colour)] = areas[colour]
+
+    def set_scores(self, left, right):
+        self.scores["left"] = left
+        self.scores["right"] = right
+
+    ## all metrics in the Prometheus text format
+    def render(self):
+        ## copies of the dictionaries, as the game loop may add a colour while they are formatted
+        metrics = [
+            ("pong_frames_total", "counter", "Frames played by the game loop", {"": self.frames}),
+            ("pong_game_fps", "gauge", "Frames per second of the game loop (moving average)", {"": 1 / self.frame_interval if self.frame_interval else 0.0}),
+            ("pong_camera_frames_total", "counter", "New camera frames read by the game", {"": self.camera_frames}),
+            ("pong_camera_fps", "gauge", "Camera frames captured per second, from the capture timestamps (moving average)", {"": 1 / self.camera_interval if self.camera_interval else 0.0}),
+            ("pong_camera_stale_frames_total", "counter", "Game frames for which the camera had no new frame (resize and colour tracking were skipped)", {"": self.stale_frames}),
+            ("pong_camera_dropped_frames_total", "counter", "Camera frames that were replaced by a newer frame before the game read them", {"": self.dropped_frames}),
+            ("pong_camera_frame_age_seconds", "gauge", "Time between the capture of a new camera frame and the game reading it (moving average)", {"": self.frame_age}),
+            ("pong_tracking_skipped_frames_total", "counter", "Camera frames whose colour tracking was skipped because the scene did not change", {"": self.reused_frames}),
+            ("pong_tracker_calls_total", "counter", "Camera frames whose colours were tracked", {"": self.tracker_calls}),
+            ("pong_tracker_seconds_total", "counter", "Time spent tracking the colours of camera frames since the start", {"": self.tracker_seconds_total}),
+            ("pong_stage_seconds", "gauge", "Time spent in a stage of a frame (moving average)", {f'stage="{stage}"': value for stage, value in dict(self.stage_seconds).items()}),
+            ("pong_stage_seconds_total", "counter", "Time spent in a stage of the game loop since the start", {f'stage="{stage}"': value for stage, value in dict(self.stage_seconds_total).items()}),
+            ("pong_detections", "gauge", "Contours (or players) detected for every colour in the last tracked frame", {f'colour="{colour}"': value for colour, value in dict(self.detections).items()}),
+            ("pong_detection_area", "gauge", "Total area of the contours detected for every colour in the last tracked frame", {f'colour="{colour}"': value for colour, value in dict(self.detection_area).items()}),
+            ("pong_score", "gauge", "Score of every side", {f'side="{side}"': value for side, value in dict(self.scores).items()}),
+        ]
+        lines = []
+        for name, kind, description, samples in metrics:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples.items():
+                lines.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+## serve the metrics on http://host:port/metrics from a background thread; returns the server, stop it with server.shutdown()
+def start_metrics_server(metrics, port, host="127.0.0.1"):
+    ## imported here, so that the game only loads the HTTP server when the metrics are served
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        ## do not print a line for every scrape in the terminal of the game
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"[INFO] Metrics are served on http://{host}:{port}/metrics")
+    return server
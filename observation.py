@@ -0,0 +1,103 @@
+import numpy as np
+import time
+
+
+"""
+Observation renderer: pixels of the pong game for learning agents, without pygame.
+A reinforcement learning agent (see the ideas in tutorials.py) usually looks at small grayscale images, for example 84x84 pixels, and at the last few of them to see where the balls are heading.
+Drawing the game on the pygame screen and reading back 900x600x3 pixels for every step is slow, so this renderer draws the balls and strikers straight into NumPy arrays.
+All games of a batch are drawn in one vectorised call and the frames are written into arrays that are allocated once.
+
+The newest frame is always the last one of the stack: frames[game, -1]
+Practice: run this code to see how many batches of observations can be made per second.
+"""
+
+WIDTH, HEIGHT = 900, 600
+
+
+class ObservationRenderer:
+    def __init__(self, num_games, size=84, stack=4, field_size=(WIDTH, HEIGHT), ball_value=255, striker_value=128):
+        self.num_games = num_games
+        self.size = size
+        self.ball_value = ball_value
+        self.striker_value = striker_value
+        self.frames = np.zeros((num_games, stack, size, size), dtype=np.uint8)
+        ## the left (top) border of every pixel in field coordinates
+        self.cell_w = field_size[0] / size
+        self.cell_h = field_size[1] / size
+        self.pixel_x0 = np.arange(size) * self.cell_w
+        self.pixel_y0 = np.arange(size) * self.cell_h
+
+    def reset(self, games=None):
+        ## clear the stack of all games, or only of the games that just started a new match
+        if games is None:
+            self.frames.fill(0)
+        else:
+            self.frames[games] = 0
+
+    def render(self, ball_positions, ball_radii, striker_rects):
+        ## input: ball_positions (games, balls, 2), ball_radii (balls,) or (games, balls), striker_rects (games, strikers, 4) as x, y, width, height
+        ## output: the stack of frames (games, stack, size, size); the arrays are reused, so copy them if you need to keep them
+        ball_positions = np.asarray(ball_positions, dtype=np.float32)
+        striker_rects = np.asarray(striker_rects, dtype=np.float32)
+        radii = np.broadcast_to(np.asarray(ball_radii, dtype=np.float32), ball_positions.shape[:2])
+
+        ## push the older frames back in the stack
+        self.frames[:, :-1] = self.frames[:, 1:]
+        frame = self.frames[:, -1]
+
+        ## strikers: a pixel is painted when it overlaps the rectangle. The union of the rectangles is the product of
+        ## the rows and the columns they cover, summed over the strikers of a game: one batched matrix product
+        x, y, w, h = (striker_rects[..., k, None] for k in range(4))
+        cover_x = (x < self.pixel_x0 + self.cell_w) & (x + w > self.pixel_x0)
+        cover_y = (y < self.pixel_y0 + self.cell_h) & (y + h > self.pixel_y0)
+        strikers = np.matmul(cover_y.transpose(0, 2, 1).astype(np.float32), cover_x.astype(np.float32))
+        np.multiply(strikers > 0, np.uint8(self.striker_value), out=frame)
+
+        ## balls: they only cover a few pixels, so instead of testing every pixel of the frame, a small window of pixels
+        ## around every ball is tested for all balls at once. A pixel is painted when the closest point of the pixel is
+        ## inside the circle, so that even a ball smaller than one pixel is still visible
+        cx = ball_positions[..., 0]
+        cy = ball_positions[..., 1]
+        first_px = np.floor((cx - radii) / self.cell_w).astype(np.intp)
+        first_py = np.floor((cy - radii) / self.cell_h).astype(np.intp)
+        window_x = int(np.ceil(2 * radii.max(initial=0) / self.cell_w)) + 1
+        window_y = int(np.ceil(2 * radii.max(initial=0) / self.cell_h)) + 1
+        games = np.broadcast_to(np.arange(self.num_games)[:, None], cx.shape)
+        for oy in range(window_y):
+            py = first_py + oy
+            dy = np.maximum(np.abs((py + 0.5) * self.cell_h - cy) - self.cell_h / 2, 0)
+            for ox in range(window_x):
+                px = first_px + ox
+                dx = np.maximum(np.abs((px + 0.5) * self.cell_w - cx) - self.cell_w / 2, 0)
+                painted = (dx * dx + dy * dy <= radii * radii) & (px >= 0) & (px < self.size) & (py >= 0) & (py < self.size)
+                frame[games[painted], py[painted], px[painted]] = self.ball_value
+        return self.frames
+
+
+## collect the positions of Ball and Striker objects of one game as arrays for ObservationRenderer.render
+## stack the outputs of several games with np.stack to render them as a batch
+def game_arrays(list_of_balls, list_of_strikers):
+    ball_positions = np.array([(ball.posx, ball.posy) for ball in list_of_balls], dtype=np.float32)
+    ball_radii = np.array([ball.radius for ball in list_of_balls], dtype=np.float32)
+    striker_rects = np.array(
+        [(striker._posx, striker.posy, striker.width, striker.height) for striker in list_of_strikers],
+        dtype=np.float32,
+    )
+    return ball_positions, ball_radii, striker_rects
+
+
+if __name__ == "__main__":
+    num_games = 256
+    renderer = ObservationRenderer(num_games)
+    rng = np.random.default_rng(0)
+    ball_positions = rng.uniform((0, 0), (WIDTH, HEIGHT), (num_games, 2, 2))
+    striker_rects = np.zeros((num_games, 2, 4))
+    striker_rects[:, :] = ((20, 0, 10, 100), (WIDTH - 30, 0, 10, 100))
+    striker_rects[:, :, 1] = rng.uniform(0, HEIGHT - 100, (num_games, 2))
+    repeats = 100
+    start = time.perf_counter()
+    for _ in range(repeats):
+        renderer.render(ball_positions, 7, striker_rects)
+    elapsed = time.perf_counter() - start
+    print(f"{repeats * num_games / elapsed:.0f} observations of {renderer.size}x{renderer.size} per second ({num_games} games per call)")
@@ -0,0 +1,137 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+
+"""
+Parameter sweep: how do the ball speed, the striker speed and the buffer distance of the PC player change who wins?
+Instead of changing these numbers by hand in pong_game.py, this plays headless matches for every combination of the given values, on all cores of the PC.
+In every match, the left PC player uses the buffer distance of the sweep and the right PC player uses the default buffer distance (10) as the reference.
+The table shows how often the left player wins (a draw counts as half a win).
+
+Every result is saved in 'sweep_cache.json', together with the version of the game code. When you run the sweep again, or add more values,
+only the combinations that are not in the cache yet are played. When the game code changes, the old results are not used anymore.
+
+python parameter_sweep.py --ball_speeds 3 5 7 --striker_speeds 5 10 15 --buffer_distances 0 10 20 40
+"""
+
+CACHE_PATH = Path(__file__).with_name("sweep_cache.json")
+## the files whose code decides the result of a match
+CODE_FILES = ["pong_game.py", "pong_match.py", "spatial_hash.py", "parameter_sweep.py"]
+REFERENCE_BUFFER_DISTANCE = 10
+
+
+def code_version():
+    digest = hashlib.sha1()
+    for name in CODE_FILES:
+        digest.update(Path(__file__).with_name(name).read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def cell_key(cell, version):
+    return json.dumps(dict(cell, version=version), sort_keys=True)
+
+
+## play all matches of one combination of parameters; runs in a worker process
+def play_cell(cell):
+    from pong_match import Match
+    from pong_game import AI_controller, AI_controller_2balls
+
+    wins, points_difference = 0, 0
+    for seed in range(cell["matches"]):
+        match = Match(
+            two_balls=cell["two_balls"],
+            seed=seed,
+            ## the second ball keeps the difference of speed of the original game (3 and 5)
+            ball_speeds=(cell["ball_speed"], cell["ball_speed"] + 2),
+            striker_speed=cell["striker_speed"],
+        )
+        for _ in range(cell["frames"]):
+            if match.ball2 is not None:
+                strikerL_y_fac = AI_controller_2balls(match.ball, match.ball2, match.strikerL, cell["buffer_distance"])
+                strikerR_y_fac = AI_controller_2balls(match.ball, match.ball2, match.strikerR, REFERENCE_BUFFER_DISTANCE)
+            else:
+                strikerL_y_fac = AI_controller(match.ball, match.strikerL, cell["buffer_distance"])
+                strikerR_y_fac = AI_controller(match.ball, match.strikerR, REFERENCE_BUFFER_DISTANCE)
+            match.step(strikerL_y_fac, strikerR_y_fac)
+        ## a draw counts as half a win
+        wins += 1 if match.scores[0] > match.scores[1] else 0.5 if match.scores[0] == match.scores[1] else 0
+        points_difference += match.scores[0] - match.scores[1]
+    return {"win_rate": wins / cell["matches"], "mean_points_difference": points_difference / cell["matches"]}
+
+
+def load_cache():
+    if CACHE_PATH.is_file():
+        with open(CACHE_PATH, "r") as jsonfile:
+            return json.load(jsonfile)
+    return {}
+
+
+def save_cache(cache):
+    ## write to a temporary file first, so that an interrupted sweep never leaves a broken cache behind
+    temporary = CACHE_PATH.with_suffix(".tmp")
+    with open(temporary, "w") as jsonfile:
+        json.dump(cache, jsonfile, indent=1)
+    os.replace(temporary, CACHE_PATH)
+
+
+def sweep(args):
+    version = code_version()
+    cells = [
+        {
+            "ball_speed": ball_speed,
+            "striker_speed": striker_speed,
+            "buffer_distance": buffer_distance,
+            "two_balls": args.two_balls,
+            "matches": args.matches,
+            "frames": args.frames,
+        }
+        for ball_speed, striker_speed, buffer_distance in itertools.product(
+            args.ball_speeds, args.striker_speeds, args.buffer_distances
+        )
+    ]
+    cache = load_cache()
+    missing = [cell for cell in cells if cell_key(cell, version) not in cache]
+    print(f"[INFO] {len(cells)} combinations, {len(cells) - len(missing)} found in the cache, {len(missing)} to play (code version {version})")
+    if missing:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = {executor.submit(play_cell, cell): cell for cell in missing}
+            for done, future in enumerate(as_completed(futures), 1):
+                cache[cell_key(futures[future], version)] = future.result()
+                ## save after every combination, so that an interrupted sweep keeps what it has played
+                save_cache(cache)
+                print(f"[INFO] {done}/{len(missing)} combinations played", end="\r")
+        print()
+    return {
+        (cell["ball_speed"], cell["striker_speed"], cell["buffer_distance"]): cache[cell_key(cell, version)]
+        for cell in cells
+    }
+
+
+def print_table(results, args):
+    header = "ball speed | striker speed | " + " | ".join(f"buffer {distance:>4}" for distance in args.buffer_distances)
+    print(f"Win rate of the left PC player (buffer distance in the columns) against the reference (buffer {REFERENCE_BUFFER_DISTANCE})")
+    print(header)
+    print("-" * len(header))
+    for ball_speed, striker_speed in itertools.product(args.ball_speeds, args.striker_speeds):
+        row = " | ".join(
+            f"{results[(ball_speed, striker_speed, distance)]['win_rate']:>11.0%}" for distance in args.buffer_distances
+        )
+        print(f"{ball_speed:>10} | {striker_speed:>13} | {row}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ball_speeds", type=int, nargs="+", default=[3, 5, 7], help="Speeds of the (first) ball")
+    ap.add_argument("--striker_speeds", type=int, nargs="+", default=[5, 10, 15], help="Speeds of both strikers")
+    ap.add_argument("--buffer_distances", type=int, nargs="+", default=[0, 10, 20, 40], help="Buffer distances of the left PC player")
+    ap.add_argument("-b", "--two_balls", action='store_true', help="Whether to play with two balls or not")
+    ap.add_argument("-m", "--matches", type=int, default=10, help="How many matches (with different seeds) to play for every combination")
+    ap.add_argument("-f", "--frames", type=int, default=3000, help="How many frames every match lasts")
+    ap.add_argument("-w", "--workers", type=int, help="How many processes to use. If it's  not provided, all cores are used")
+    args = ap.parse_args()
+    print_table(sweep(args), args)
@@ -1,12 +1,10 @@
 import pygame
 import json
-import cv2
 import numpy as np
 import argparse
-import imutils
-from imutils.video import WebcamVideoStream
-from imutils.video import FPS
-from color_identification import hsv_color_range
+from spatial_hash import SpatialHash
+from ball_renderer import BallRenderer
+from metrics import Metrics, start_metrics_server
 from collections import deque
 from pathlib import Path
 
@@ -40,11 +38,13 @@ python pong_game.py -c -v
 For more details, check out the bottom of this code or use -h to ask for help on the Cmd or Terminal
 '''
 
-pygame.init()
-
 # Basic parameters of the screen
 WIDTH, HEIGHT = 900, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
+# Width of the camera frames used for colour tracking
+CAMERA_WIDTH = 480
+FIELD_RECT = pygame.Rect(0, 0, WIDTH, HEIGHT)
+# The window and the font are only created when the game starts (see init_display), so that importing this file stays fast
+screen = None
 
 clock = pygame.time.Clock()
 
@@ -55,18 +55,44 @@ GREEN = pygame.Color(0, 255, 0)
 RED = pygame.Color(255, 0, 0)
 
 # Font that is used to render the text
-font20 = pygame.font.Font("freesansbold.ttf", 20)
+font20 = None
 
 rolling_average_buffer = deque(maxlen=10)#rolling average butter
 
+
+## open the game window and load the font; with a surface, the game is drawn into that surface instead of a window (see match_video.py)
+def init_display(surface=None):
+    global screen, font20
+    if surface is not None:
+        pygame.font.init()
+        screen = surface
+    else:
+        pygame.init()
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    font20 = pygame.font.Font("freesansbold.ttf", 20)
+    return screen
+
+
+## the vision packages (OpenCV, imutils) take a while to import and are only needed when playing with the camera, so they are imported here on first use
+def load_vision_stack():
+    global cv2, ConfiguredVideoStream, fit_frame, print_camera_report, ColorTracker, MotionGate, CameraView, range_colour, label_palette, FPS, hsv_color_range, auto_hsv_color_range, CollectiveTracker, load_collective_config, collective_controller, MIN_PIXELS
+    import cv2
+    from camera_config import ConfiguredVideoStream, fit_frame, print_camera_report
+    from color_tracker import ColorTracker, MotionGate
+    from camera_view import CameraView, range_colour, label_palette
+    from imutils.video import FPS
+    from color_identification import hsv_color_range, auto_hsv_color_range
+    from collective_tracking import CollectiveTracker, load_collective_config, collective_controller, MIN_PIXELS
+
 class Striker:
-    def __init__(self, posx, posy, width, height, speed, color):
+    def __init__(self, posx, posy, width, height, speed, color, lane=None):
         self._posx = posx
         self._posy = posy
         self.width = width
         self.height = height
         self.speed = speed
         self.color = color
+        self.lane = lane if lane is not None else (0, HEIGHT)#the top and bottom of the part of the field the striker can move in
         self.striker_rect = pygame.Rect(posx, posy, width, height)
 
     @property
@@ -75,7 +101,7 @@ class Striker:
 
     @posy.setter
     def posy(self, value):
-        self._posy = max(0, min(value, HEIGHT - self.height))
+        self._posy = max(self.lane[0], min(value, self.lane[1] - self.height))
         self.striker_rect.y = self._posy
 
     def display(self):
@@ -102,9 +128,7 @@ class Ball:
         self.color = color
         self.x_fac = 1
         self.y_fac = -1
-        self.ball = pygame.draw.circle(
-            screen, self.color, (self.posx, self.posy), self.radius
-        )
+        self.update_rect()
         self.infield = True
 
     def display(self):
@@ -112,6 +136,12 @@ class Ball:
             screen, self.color, (self.posx, self.posy), self.radius
         )
 
+    def update_rect(self):
+        ## the same area that pygame.draw.circle covers in the field, without drawing anything
+        self.ball = pygame.Rect(
+            self.posx - self.radius, self.posy - self.radius, 2 * self.radius, 2 * self.radius
+        ).clip(FIELD_RECT)
+
     def update(self):
         self.posx += self.speed * self.x_fac
         self.posy += self.speed * self.y_fac
@@ -137,6 +167,25 @@ class Ball:
     def hit(self):
         self.x_fac *= -1
 
+    def bounce(self, other):
+        ## narrow-phase check between two balls: they collide when the centres are closer than the sum of radii
+        dx = other.posx - self.posx
+        dy = other.posy - self.posy
+        if dx * dx + dy * dy > (self.radius + other.radius) ** 2:
+            return False
+        ## only bounce when the balls move towards each other, otherwise overlapping balls would get stuck together
+        dvx = other.speed * other.x_fac - self.speed * self.x_fac
+        dvy = other.speed * other.y_fac - self.speed * self.y_fac
+        if dx * dvx + dy * dvy >= 0:
+            return False
+        if abs(dx) >= abs(dy):
+            self.x_fac *= -1
+            other.x_fac *= -1
+        else:
+            self.y_fac *= -1
+            other.y_fac *= -1
+        return True
+
     def get_rect(self):
         return self.ball
 
@@ -162,9 +211,8 @@ def keyboard_controller(event, pygame):
 
 ## this method updates the position of striker based on ball's position
 
-def AI_controller(ball, striker):
+def AI_controller(ball, striker, buffer_distance=10):
     y_fac = 0
-    buffer_distance = 10
     if ball.posy > striker.posy and abs(ball.posy - striker.posy) > buffer_distance:
         y_fac = 1
     elif ball.posy < striker.posy and abs(ball.posy - striker.posy) > buffer_distance:
@@ -175,9 +223,8 @@ def AI_controller(ball, striker):
 ## this method is an advanced from the first one. Calculate the distance of balls and the striker and focus on the ball that nearer the striker
 ## balls class and striker class
 
-def AI_controller_2balls(ball1, ball2, striker):
+def AI_controller_2balls(ball1, ball2, striker, buffer_distance=10):
     y_fac = 0
-    buffer_distance = 10
     ball1_arr = np.array((ball1.posx, ball1.posy))
     ball2_arr = np.array((ball2.posx, ball2.posy))
     striker_arr = np.array((striker._posx, striker._posy))
@@ -212,25 +259,6 @@ def AI_controller_2balls(ball1, ball2, striker):
     return y_fac
 
 
-## use openCV packages to identify particular colour
-## input: frame, colour range, output: detected the area size and number of the detected contour
-def color_track(img, lower_range, upper_range):
-    ## based on the size of area you saw when identifying right colour for tracking
-    ## set a reasonable range of "min_area" and "max_area" here to isolate the right contour.
-    min_area = 10
-    max_area =300
-    num_cnt = 0
-    area = 0
-    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-    mask = cv2.inRange(hsv, lower_range, upper_range)
-    _, mask1 = cv2.threshold(mask, 254, 255, cv2.THRESH_BINARY)
-    cnts, _ = cv2.findContours(mask1, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
-    OutArea = [cv2.contourArea(c) for c in cnts if cv2.contourArea(c) > min_area and cv2.contourArea(c) < max_area]
-    num_cnt = len(OutArea)
-    area = sum(OutArea)
-
-    return num_cnt, area
-
 def camera_controller(colour1, track2, colour1_init=None, track2_init=None):
     if colour1_init is None or track2_init is None:
         if game_modes.single_player:
@@ -256,9 +284,32 @@ def camera_controller(colour1, track2, colour1_init=None, track2_init=None):
     return [y_fac, y_fac2]
 
 
+## collide rules of balls: the spatial hash finds candidate pairs (broad phase) and only those are checked exactly (narrow phase)
+## input: list of balls, list of strikers, SpatialHash of the field, whether balls bounce off each other
+def collide(balls, strikers, grid, ball_collision=False):
+    grid.clear()
+    num_balls = len(balls)
+    for i, ball in enumerate(balls):
+        grid.insert(i, ball.get_rect())
+    for j, striker in enumerate(strikers):
+        grid.insert(num_balls + j, striker.get_rect())
+    for a, b in grid.candidate_pairs():
+        if b < num_balls:
+            if ball_collision:
+                balls[a].bounce(balls[b])
+        elif a < num_balls:
+            if pygame.Rect.colliderect(balls[a].get_rect(), strikers[b - num_balls].get_rect()):
+                balls[a].hit()
+
+
 def main(game_modes):
     running = True
     counter = 0
+    if game_modes.collective:
+        game_modes.play_with_camera = True#the collective mode is always played with the camera
+    if game_modes.play_with_camera:
+        load_vision_stack()
+    init_display()
     strikerL = Striker(20, 0, 10, 100, 10, GREEN)
     strikerR = Striker(WIDTH - 30, 0, 10, 100, 10, GREEN)
     ball = Ball(WIDTH // 2, HEIGHT // 2, 7, 3, WHITE)
@@ -272,7 +323,13 @@ def main(game_modes):
     if game_modes.play_with_camera:
         print("Controlling the Striker with your camera")
         colour_profile = Path('color_ranges.json')
-        if colour_profile.is_file()==False or game_modes.update_color_range:
+        if game_modes.auto_calibrate:
+            print(
+            "[INFO] colour auto-calibration: drag a box around a card and press ENTER, then keep the card in the box for a few seconds. Repeat for the next card and press ESC to exit"
+        )
+            auto_hsv_color_range()
+            print(f"[INFO] Complete updating the colour thresholds in the colour profile and use the new colour profile")
+        elif colour_profile.is_file()==False or game_modes.update_color_range:
           
             print(
             "[INFO] colour identification: use mouse cursor to adjust lower and upper bound of the threshold to isolate color spectrum. Isolated color will be shown as white in the Mask window. Press S to save and Q to exit"
@@ -287,11 +344,42 @@ def main(game_modes):
             )
         with open('color_ranges.json', 'r') as jsonfile:
             data = json.load(jsonfile)
+        if game_modes.collective:
+            players = load_collective_config(game_modes.collective)
+            print(f"[INFO] Collective mode: {len(players)} strikers are controlled by the colour profiles listed in {game_modes.collective}")
+            collective_tracker = CollectiveTracker(data, [player.get('profiles') for player in players])
+            collective_strikers = []
+            for player in players:
+                lane = player.get('lane', [0, HEIGHT])
+                collective_strikers.append(
+                    Striker(player.get('posx', WIDTH - 30), lane[0], 10, min(100, lane[1] - lane[0]), 10, GREEN, lane=lane)
+                )
+            collective_y_facs = [0] * len(collective_strikers)
+        else:
+            lower_ranges = [np.array(data[0].get('lower_range')), np.array(data[1].get('lower_range'))]
+            upper_ranges = [np.array(data[0].get('upper_range')), np.array(data[1].get('upper_range'))]
         #Setting up camera streamming
-        lower_ranges = [np.array(data[0].get('lower_range')), np.array(data[1].get('lower_range'))]
-        upper_ranges = [np.array(data[0].get('upper_range')), np.array(data[1].get('upper_range'))]
-        cap = WebcamVideoStream(src=0).start()
+        cap = ConfiguredVideoStream(
+            src=0,
+            width=game_modes.camera_width,
+            height=game_modes.camera_height,
+            fps=game_modes.camera_fps,
+            fourcc=game_modes.camera_fourcc,
+            buffer_size=game_modes.camera_buffer,
+        ).start()
+        ## with several vision threads, the frames are tracked at the size the camera delivers instead of 480 pixels wide, split into stripes (see color_tracker.py)
+        ## the area limits of the contours grow with the frame, and the areas are scaled back, so the controllers see the same values as with 480 pixels wide frames
+        native_tracking = game_modes.vision_threads > 1 and not game_modes.collective
+        if native_tracking:
+            print_camera_report(cap.report)
+        else:
+            print_camera_report(cap.report, game_modes.camera_width, game_modes.camera_height)
+        area_scale = (cap.frame.shape[1] / CAMERA_WIDTH) ** 2 if native_tracking else 1.0
+        if not game_modes.collective:
+            ## the tracker does the colour tracking of both colours, and reuses its images at every frame
+            tracker = ColorTracker(lower_ranges, upper_ranges, min_area=10 * area_scale, max_area=300 * area_scale, stripes=game_modes.vision_threads)
         fps = FPS().start()
+        motion_gate = MotionGate(threshold=game_modes.motion_threshold) if game_modes.motion_gate else None
         pygame.display.set_caption("Pong game with camera: Close this window or press ESC to end the game")
 
     elif game_modes.observer_mode:
@@ -304,13 +392,30 @@ def main(game_modes):
         print("Controlling the Striker with the keyboard. Use Up and Down to control player 1 (the right striker's movement). RIGHT and LEFT button are set to control the second player's movement (the left striker) by default, if player 2 is available")
 
 
-    list_of_strikers = [strikerL, strikerR]
+    if game_modes.collective:
+        list_of_strikers = [strikerL] + collective_strikers
+    else:
+        list_of_strikers = [strikerL, strikerR]
+    list_of_balls = [ball, ball2] if game_modes.two_balls else [ball]
+    grid = SpatialHash(WIDTH, HEIGHT)
+    ball_renderer = BallRenderer()
+    lookahead = None
+    if game_modes.lookahead:
+        from lookahead_ai import LookaheadAI
+        lookahead = LookaheadAI([strikerL, strikerR], list_of_balls, side=0, time_budget=game_modes.lookahead_budget / 1000, ball_collision=game_modes.ball_collision)
     strikerL_score, strikerR_score = 0, 0
     strikerL_y_fac, strikerR_y_fac = 0, 0
     area1_init = 0
     area2_init = 0
+    camera_view = None
+    ## live numbers of the game loop, served over HTTP with -m (see metrics.py)
+    metrics = Metrics()
+    metrics_server = start_metrics_server(metrics, game_modes.metrics_port) if game_modes.metrics_port else None
     while running:
+        metrics.start_frame()
         screen.fill(BLACK)
+        if camera_view is not None:
+            camera_view.draw(screen)
         if game_modes.observer_mode:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -327,14 +432,39 @@ def main(game_modes):
                 strikerR_y_fac = AI_controller(ball, strikerR)
 
         elif game_modes.play_with_camera:
-            # initiate video capture with imutils
-            frame = cap.read()
-            frame = imutils.resize(frame, width=480, height=640)
-            # do colour tracking here
-            num_1, area_1 = color_track(frame, lower_ranges[0], upper_ranges[0])
-            num_2, area_2 = color_track(frame, lower_ranges[1], upper_ranges[1])
+            # initiate video capture with imutils, the frame is only resized when the camera could not deliver the processing size
+            # the game runs faster than the camera: a frame that was already processed (same sequence number) is not resized nor tracked again
+            sequence, timestamp, camera_frame = cap.read_latest()
+            new_frame = metrics.camera_frame(sequence, timestamp)
+            if new_frame:
+                frame = camera_frame if native_tracking else fit_frame(camera_frame, CAMERA_WIDTH)
+            metrics.lap("camera")
+            # do colour tracking here, unless the motion gate finds that the scene did not change: then the last result is used again
+            if new_frame and (motion_gate is None or motion_gate.changed(frame)):
+                if game_modes.collective:
+                    counts, centroids = metrics.track(collective_tracker, frame)
+                    metrics.set_detections(counts)
+                else:
+                    (num_1, area_1), (num_2, area_2) = metrics.track(tracker, frame)
+                    area_1, area_2 = area_1 / area_scale, area_2 / area_scale
+                    metrics.set_detections([num_1, num_2], [area_1, area_2])
+                # show the camera frame and what was detected in the game window
+                if game_modes.camera_view:
+                    if game_modes.collective:
+                        if camera_view is None:
+                            camera_view = CameraView(frame.shape, [label_palette(len(collective_strikers))])
+                        camera_view.update(frame, [collective_tracker.labels], [f"players seen: {np.count_nonzero(counts >= MIN_PIXELS)}/{len(counts)}"])
+                    else:
+                        if camera_view is None:
+                            camera_view = CameraView(frame.shape, [range_colour(lower, upper) for lower, upper in zip(lower_ranges, upper_ranges)])
+                        camera_view.update(frame, tracker.masks, [f"n: {num_1} area: {area_1:.0f}", f"n: {num_2} area: {area_2:.0f}"])
+            elif new_frame:
+                metrics.reused_frames += 1
+            metrics.lap("tracking")
+            if game_modes.collective:
+                collective_y_facs = collective_controller(collective_strikers, counts, centroids, frame.shape[0])
             # save initial value of area size or whatever you want to compare
-            if counter == 0:
+            if counter == 0 and not game_modes.collective:
                 area1_init = area_1
                 area2_init = area_2
 
@@ -345,7 +475,13 @@ def main(game_modes):
                     if event.key == pygame.K_ESCAPE:
                         running = False
             # entering controlling striker section
-            if game_modes.single_player == True:
+            if game_modes.collective:
+                # telling the PC how to play against the collective
+                if game_modes.two_balls:
+                    strikerL_y_fac = AI_controller_2balls(ball, ball2, strikerL)
+                else:
+                    strikerL_y_fac = AI_controller(ball, strikerL)
+            elif game_modes.single_player == True:
                 if game_modes.use_baseline_value == True:
                     y_list = camera_controller(
                         area_1, area_2, area1_init, area2_init
@@ -392,18 +528,20 @@ def main(game_modes):
                 strikerR_y_fac = y_list[0]
                 strikerL_y_fac = y_list[1]
 
+        # the lookahead PC player takes over the left striker from the PC player
+        if lookahead is not None and (game_modes.observer_mode or game_modes.single_player) and not game_modes.collective:
+            strikerL_y_fac = lookahead.decide([strikerL_score, strikerR_score], counter)
+        metrics.lap("control")
         ##update the position of the paddles
-        strikerR.update(strikerR_y_fac)
+        if game_modes.collective:
+            for striker, y_fac in zip(collective_strikers, collective_y_facs):
+                striker.update(y_fac)
+        else:
+            strikerR.update(strikerR_y_fac)
         strikerL.update(strikerL_y_fac)
         counter += 1
         ##collide rules of balls
-        for striker in list_of_strikers:
-            if pygame.Rect.colliderect(ball.get_rect(), striker.get_rect()):
-                ball.hit()
-            if game_modes.two_balls and pygame.Rect.colliderect(
-                ball2.get_rect(), striker.get_rect()
-            ):
-                ball2.hit()
+        collide(list_of_balls, list_of_strikers, grid, game_modes.ball_collision)
 
         ##update the position of the balls
         point1 = ball.update()
@@ -424,26 +562,43 @@ def main(game_modes):
             ball.reset()
         if game_modes.two_balls and point2:
             ball2.reset()
-        ##drawing the balls, scores and strikers
-        strikerL.display()
-        strikerR.display()
-        ball.display()
-        if game_modes.two_balls:
-            ball2.display()
+        metrics.set_scores(strikerL_score, strikerR_score)
+        metrics.lap("physics")
+        ##drawing the balls (all at once, see ball_renderer.py), scores and strikers
+        for striker in list_of_strikers:
+            striker.display()
+        ball_renderer.draw_balls(screen, list_of_balls)
+        for each_ball in list_of_balls:
+            each_ball.update_rect()
 
         strikerL.display_score("Konstanz Gamer : ", strikerL_score, 100, 20, WHITE)
         strikerR.display_score(
             "Collective Power : ", strikerR_score, WIDTH - 100, 20, WHITE
         )
         pygame.display.update()
+        metrics.lap("draw")
         clock.tick(pygame_fps)
+        metrics.lap("wait")
         if game_modes.play_with_camera:
             fps.update()
+    if metrics_server is not None:
+        metrics_server.shutdown()
     ##output streaming information at the end of the game.
     if game_modes.play_with_camera:
         fps.stop()
         cv2.destroyAllWindows()
         cap.stop()
+        ## the time of the tracker calls alone: the tracking stage also includes the motion gate and the camera view
+        tracking_seconds = metrics.tracker_seconds_total / max(1, metrics.tracker_calls)
+        print(
+            f"[INFO] The camera delivered {metrics.camera_frames} new frames to {metrics.frames} game frames: resizing and colour tracking were skipped in {metrics.stale_frames} game frames "
+            f"that had no new camera frame, saving about {metrics.stale_frames * tracking_seconds:.1f} s of tracking ({tracking_seconds * 1000:.1f} ms per frame). "
+            f"{metrics.dropped_frames} camera frames were replaced by newer ones before the game could read them"
+        )
+        if motion_gate is not None:
+            print(f"[INFO] The motion gate skipped colour tracking in {motion_gate.num_skipped} of {motion_gate.num_checked} frames ({motion_gate.skip_ratio:.0%}) because the scene did not change")
+        if not game_modes.collective:
+            print(f"[INFO] Colour tracking allocated {tracker.total_frame_bytes_allocated} bytes for images in {tracker.num_frames} frames ({tracker.frame_bytes_allocated} bytes in the last frame) and {tracker.contour_bytes} bytes for the contours of the last frame")
         print(f"[INFO] The PYGAME_FPS is {pygame_fps}. However, this camera captures frames at approx. FPS: {fps.fps()}. Try changing the argument PYGAME_FPS from 30, 60, 120, 240, to 1000 and observe how that would affect camera frame rate. Could you explain how the difference between pygame fps and camera frame rate might affect your gaming experience?")
 
 
@@ -455,6 +610,12 @@ if __name__ == "__main__":
         action='store_true',
         help="Whether to use two ball or not. If it's  not provided, one ball is used",
     )
+    ap.add_argument(
+        "-x",
+        "--ball_collision",
+        action='store_true',
+        help="Whether balls bounce off each other or not. If it's  not provided, balls pass through each other",
+    )
     ap.add_argument(
         "-s",
         "--single_player",
@@ -473,12 +634,67 @@ if __name__ == "__main__":
         action='store_true',
         help="Whether to watch two PC players playing or not. If it's  not provided, initiates the play mode",
     )
+    ap.add_argument(
+        "-n",
+        "--collective",
+        nargs='?',
+        const='collective_config.json',
+        help="Whether to play the collective mode or not: every striker of the collective is driven by its own colour card(s), as listed in this config file (collective_config.json by default). It always uses the camera",
+    )
+    ap.add_argument(
+        "-w",
+        "--camera_view",
+        action='store_true',
+        help="Whether to show the camera frame and the detected colours in the game window or not (in camera mode)",
+    )
+    ap.add_argument(
+        "-g",
+        "--motion_gate",
+        action='store_true',
+        help="Whether to skip colour tracking when the camera image did not change or not (in camera mode). If it's  not provided, every frame is tracked",
+    )
+    ap.add_argument(
+        "--motion_threshold",
+        type=float,
+        default=6.0,
+        help="Largest difference of brightness (0-255) of any cell of two small (32x24) versions of the camera image below which the scene counts as unchanged. A card appearing, moving or disappearing changes its cells by much more",
+    )
+    ap.add_argument(
+        "--vision_threads",
+        type=int,
+        default=1,
+        help="Number of threads that track the colours in horizontal stripes of the camera image. With more than 1, the camera image is tracked at the size the camera delivers instead of being resized to 480 pixels wide, which only pays off for big frames on a PC with several cores, for example --vision_threads 4 --camera_width 1920 --camera_height 1080. If it's  not provided, the image is resized and tracked on one thread",
+    )
+    ap.add_argument(
+        "-l",
+        "--lookahead",
+        action='store_true',
+        help="Whether the PC player of the left striker plans its moves by trying them (lookahead_ai.py) or not. If it's  not provided, AI_controller is used",
+    )
+    ap.add_argument(
+        "--lookahead_budget",
+        type=float,
+        default=4.0,
+        help="Milliseconds the lookahead PC player may think at every frame",
+    )
+    ap.add_argument(
+        "-m",
+        "--metrics_port",
+        type=int,
+        help="Serve live metrics of the game (frame rates, stage times, detections, scores) on http://127.0.0.1:PORT/metrics for Prometheus or a browser. If it's  not provided, no metrics are served",
+    )
     ap.add_argument(
         "-u",
         "--update_color_range",
         action='store_true',
         help="Whether to update colour range for video tracking or not. If it's  not provided, defaults values to track blue and red are used",
     )
+    ap.add_argument(
+        "-a",
+        "--auto_calibrate",
+        action='store_true',
+        help="Whether to estimate the colour range automatically from boxes drawn around the cards or not. If it's  not provided, the trackbars are used to update the colour range",
+    )
     ap.add_argument(
         "-v",
         "--use_baseline_value",
@@ -491,6 +707,32 @@ if __name__ == "__main__":
         type=int,
         help="Use calculating striker movement based on baseline value from the first frame",
     )
+    ap.add_argument(
+        "--camera_width",
+        type=int,
+        default=CAMERA_WIDTH,
+        help="Frame width requested from the camera. When the camera delivers frames of the processing width, the frames are not resized",
+    )
+    ap.add_argument(
+        "--camera_height",
+        type=int,
+        default=CAMERA_WIDTH * 3 // 4,
+        help="Frame height requested from the camera",
+    )
+    ap.add_argument(
+        "--camera_fps",
+        type=int,
+        help="Frame rate requested from the camera. If it's  not provided, the camera's default is used",
+    )
+    ap.add_argument(
+        "--camera_fourcc",
+        help="Pixel format requested from the camera, for example MJPG. If it's  not provided, the camera's default is used",
+    )
+    ap.add_argument(
+        "--camera_buffer",
+        type=int,
+        help="Number of frames the camera driver may buffer. 1 gives the most recent frames. If it's  not provided, the camera's default is used",
+    )
     game_modes = ap.parse_args()
     main(game_modes)
     pygame.quit()
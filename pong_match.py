@@ -0,0 +1,69 @@
+import random
+from pong_game import Ball, Striker, SpatialHash, collide, WIDTH, HEIGHT, WHITE, RED, GREEN
+import game_state
+
+
+"""
+Headless match: the rules of pong_game.py without a window, for simulations that run many matches as fast as possible.
+A Match holds the strikers, the balls and the scores of one game, and step() plays one frame of the game loop in main() with the given y_fac of both strikers:
+move the strikers, collide the balls, move the balls, count the points and reset the balls that left the field.
+
+Matches started with a seed begin with the balls at a slightly different height and direction, so that repeated simulations do not all play the same rally.
+snapshot() and restore() copy the whole state of a match to and from a small flat array (see game_state.py), for example to try moves and go back.
+"""
+
+
+class Match:
+    def __init__(self, two_balls=False, ball_collision=False, seed=None, ball_speeds=(3, 5), striker_speed=10):
+        self.strikerL = Striker(20, 0, 10, 100, striker_speed, GREEN)
+        self.strikerR = Striker(WIDTH - 30, 0, 10, 100, striker_speed, GREEN)
+        self.strikers = [self.strikerL, self.strikerR]
+        self.balls = [Ball(WIDTH // 2, HEIGHT // 2, 7, ball_speeds[0], WHITE)]
+        if two_balls:
+            self.balls.append(Ball(WIDTH // 2, HEIGHT // 2, 7, ball_speeds[1], RED))
+        self.ball_collision = ball_collision
+        self.grid = SpatialHash(WIDTH, HEIGHT)
+        self.scores = [0, 0]#left striker, right striker
+        self.frame = 0
+        if seed is not None:
+            rng = random.Random(seed)
+            for ball in self.balls:
+                ball.posy += rng.randint(-HEIGHT // 4, HEIGHT // 4)
+                ball.x_fac = rng.choice((-1, 1))
+                ball.y_fac = rng.choice((-1, 1))
+                ball.update_rect()
+
+    @property
+    def ball(self):
+        return self.balls[0]
+
+    @property
+    def ball2(self):
+        return self.balls[1] if len(self.balls) > 1 else None
+
+    ## play one frame of the game; returns the points scored in this frame by the left and the right striker
+    def step(self, strikerL_y_fac, strikerR_y_fac):
+        self.strikerL.update(strikerL_y_fac)
+        self.strikerR.update(strikerR_y_fac)
+        collide(self.balls, self.strikers, self.grid, self.ball_collision)
+        pointsL, pointsR = 0, 0
+        for ball in self.balls:
+            point = ball.update()
+            if point == -1:
+                pointsR += 1
+            elif point == 1:
+                pointsL += 1
+            if point:
+                ball.reset()
+            ## in the game, drawing the ball updates the rect used for collisions
+            ball.update_rect()
+        self.scores[0] += pointsL
+        self.scores[1] += pointsR
+        self.frame += 1
+        return pointsL, pointsR
+
+    def snapshot(self, out=None):
+        return game_state.snapshot(self.strikers, self.balls, self.scores, self.frame, out)
+
+    def restore(self, state):
+        self.scores, self.frame = game_state.restore(state, self.strikers, self.balls)
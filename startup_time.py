@@ -0,0 +1,130 @@
+import subprocess
+import sys
+import argparse
+
+"""
+Startup time: how long it takes from starting python until the game has drawn its first frame.
+Every mode is measured in a fresh python process, because modules that were imported once are cached and would start instantly the second time.
+"import" is the time to import pong_game, "ready" adds what main() does in that mode before and during the first frame:
+the window and the font, the strikers and the balls, the controller of that mode (keyboard or PC players),
+and in camera mode the vision packages, the colour tracker and the camera view panel, tracking and showing one blank camera frame.
+Opening the camera itself is not measured, as that depends on your camera.
+
+Every mode is measured twice: as the game starts now, and as it started before (the baseline),
+when pong_game imported OpenCV and imutils and opened the window as soon as it was imported, whatever the mode.
+
+python startup_time.py
+"""
+
+## the first frame of the game in every mode, like the loop in main()
+FIRST_FRAME = """
+strikers = [pong_game.Striker(20, 0, 10, 100, 10, pong_game.GREEN), pong_game.Striker(pong_game.WIDTH - 30, 0, 10, 100, 10, pong_game.GREEN)]
+ball = pong_game.Ball(pong_game.WIDTH // 2, pong_game.HEIGHT // 2, 7, 3, pong_game.WHITE)
+{control}
+pong_game.screen.fill(pong_game.BLACK)
+{draw}
+for striker in strikers:
+    striker.display()
+pong_game.BallRenderer().draw_balls(pong_game.screen, [ball])
+strikers[0].display_score("Konstanz Gamer : ", 0, 100, 20, pong_game.WHITE)
+pygame.display.update()
+"""
+
+MODES = {
+    "keyboard": (
+        "pong_game.init_display()",
+        FIRST_FRAME.format(control="pong_game.keyboard_controller(pygame.event.poll(), pygame)", draw=""),
+    ),
+    "observer": (
+        "pong_game.init_display()",
+        FIRST_FRAME.format(control="pong_game.AI_controller(ball, strikers[0]); pong_game.AI_controller(ball, strikers[1])", draw=""),
+    ),
+    "camera": (
+        "pong_game.load_vision_stack(); pong_game.init_display()",
+        FIRST_FRAME.format(
+            control="""
+import numpy as np
+frame = np.zeros((pong_game.CAMERA_WIDTH * 3 // 4, pong_game.CAMERA_WIDTH, 3), dtype=np.uint8)
+lower_ranges, upper_ranges = [(110, 100, 100), (50, 100, 100)], [(130, 255, 255), (70, 255, 255)]
+tracker = pong_game.ColorTracker(lower_ranges, upper_ranges)
+(num_1, area_1), (num_2, area_2) = tracker.track(frame)
+camera_view = pong_game.CameraView(frame.shape, [pong_game.range_colour(lower, upper) for lower, upper in zip(lower_ranges, upper_ranges)])
+camera_view.update(frame, tracker.masks, [f"n: {num_1} area: {area_1:.0f}", f"n: {num_2} area: {area_2:.0f}"])
+""",
+            draw="camera_view.draw(pong_game.screen)",
+        ),
+    ),
+}
+
+## how pong_game started before: the vision packages, the window and the font at import time, for every mode
+BASELINE_IMPORT = """
+import cv2
+import imutils
+from imutils.video import WebcamVideoStream
+from imutils.video import FPS
+from color_identification import hsv_color_range
+import pygame
+pygame.init()
+screen = pygame.display.set_mode((900, 600))
+font20 = pygame.font.Font("freesansbold.ttf", 20)
+import pong_game
+pong_game.screen, pong_game.font20 = screen, font20
+"""
+
+## the window is already open in the baseline, so main() only uses it
+BASELINE_DISPLAY = "pong_game.init_display = lambda surface=None: pong_game.screen"
+
+SNIPPET = """
+import time
+start = time.perf_counter()
+{imports}
+import pygame
+imported = time.perf_counter()
+{display}
+{setup}
+{first_frame}
+ready = time.perf_counter()
+print(imported - start, ready - start)
+"""
+
+
+def measure(mode, baseline=False, repeats=5):
+    setup, first_frame = MODES[mode]
+    snippet = SNIPPET.format(
+        imports=BASELINE_IMPORT if baseline else "import pong_game",
+        display=BASELINE_DISPLAY if baseline else "",
+        setup=setup,
+        first_frame=first_frame,
+    )
+    import_times, ready_times = [], []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", snippet],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        import_time, ready_time = (float(value) for value in output.split()[-2:])
+        import_times.append(import_time)
+        ready_times.append(ready_time)
+    ## the fastest run is the least disturbed by other programs on the PC
+    return min(import_times), min(ready_times)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument(
+        "-r",
+        "--repeats",
+        type=int,
+        default=5,
+        help="How many fresh python processes to start for each mode",
+    )
+    args = ap.parse_args()
+    for mode in MODES:
+        baseline_import, baseline_ready = measure(mode, baseline=True, repeats=args.repeats)
+        import_time, ready_time = measure(mode, repeats=args.repeats)
+        print(
+            f"{mode:>8}: import {import_time * 1000:6.1f} ms, ready {ready_time * 1000:6.1f} ms "
+            f"(baseline: import {baseline_import * 1000:6.1f} ms, ready {baseline_ready * 1000:6.1f} ms, saved {(baseline_ready - ready_time) * 1000:.1f} ms)"
+        )
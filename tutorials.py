@@ -1,12 +1,7 @@
 import pygame
 import json
-import cv2
 import numpy as np
 import argparse
-import imutils
-from imutils.video import WebcamVideoStream
-from imutils.video import FPS
-from color_identification import hsv_color_range
 from collections import deque
 from pathlib import Path
 
@@ -57,11 +52,11 @@ python pong_game.py -c -v
 For more details, check out the bottom of this code or use -h to ask for help on the Cmd or Terminal
 '''
 
-pygame.init()
-
 # Basic parameters of the screen
 WIDTH, HEIGHT = 900, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
+FIELD_RECT = pygame.Rect(0, 0, WIDTH, HEIGHT)
+# The window and the font are only created when the game starts (see init_display), so that importing this file stays fast
+screen = None
 
 clock = pygame.time.Clock()
 
@@ -72,10 +67,29 @@ GREEN = pygame.Color(0, 255, 0)
 RED = pygame.Color(255, 0, 0)
 
 # Font that is used to render the text
-font20 = pygame.font.Font("freesansbold.ttf", 20)
+font20 = None
 
 rolling_average_buffer = deque(maxlen=10)#rolling average butter
 
+
+## open the game window and load the font
+def init_display():
+    global screen, font20
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    font20 = pygame.font.Font("freesansbold.ttf", 20)
+    return screen
+
+
+## the vision packages (OpenCV, imutils) take a while to import and are only needed when playing with the camera, so they are imported here on first use
+def load_vision_stack():
+    global cv2, imutils, WebcamVideoStream, FPS, hsv_color_range
+    import cv2
+    import imutils
+    from imutils.video import WebcamVideoStream
+    from imutils.video import FPS
+    from color_identification import hsv_color_range
+
 class Striker:
     def __init__(self, posx, posy, width, height, speed, color):
         self._posx = posx
@@ -119,9 +133,7 @@ class Ball:
         self.color = color
         self.x_fac = 1
         self.y_fac = -1
-        self.ball = pygame.draw.circle(
-            screen, self.color, (self.posx, self.posy), self.radius
-        )
+        self.update_rect()
         self.infield = True
 
     def display(self):
@@ -129,6 +141,12 @@ class Ball:
             screen, self.color, (self.posx, self.posy), self.radius
         )
 
+    def update_rect(self):
+        ## the same area that pygame.draw.circle covers in the field, without drawing anything
+        self.ball = pygame.Rect(
+            self.posx - self.radius, self.posy - self.radius, 2 * self.radius, 2 * self.radius
+        ).clip(FIELD_RECT)
+
     def update(self):
         self.posx += self.speed * self.x_fac
         self.posy += self.speed * self.y_fac
@@ -275,6 +293,9 @@ def camera_controller(colour1, track2, colour1_init=None, track2_init=None):
 def main(game_modes):
     running = True
     counter = 0
+    if game_modes.play_with_camera:
+        load_vision_stack()
+    init_display()
     strikerL = Striker(20, 0, 10, 100, 10, GREEN)
     strikerR = Striker(WIDTH - 30, 0, 10, 100, 10, GREEN)
     ball = Ball(WIDTH // 2, HEIGHT // 2, 7, 3, WHITE)